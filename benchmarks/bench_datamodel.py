@@ -0,0 +1,82 @@
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from src.model import compact, datamodel
+
+PRODUCTS = ("RAINFOREST_RESIN", "KELP")
+SCALE_TO = 1_000_000
+
+
+def build_ticks(model: Any, ticks: int) -> List[Any]:
+    """Objects a replay creates per tick: a listing, a 3x3 depth, 2 orders and a trade per product."""
+    history = []
+    for tick in range(ticks):
+        for product in PRODUCTS:
+            depth = model.OrderDepth()
+            for level in range(3):
+                depth.buy_orders[9998 - level] = 10 + level
+                depth.sell_orders[10002 + level] = -10 - level
+            history.append((
+                model.Listing(product, product, "SEASHELLS"),
+                depth,
+                model.Order(product, 9999, 5),
+                model.Order(product, 10001, -5),
+                model.Trade(product, 10000, 3, "SUBMISSION", "", tick * 100),
+            ))
+    return history
+
+
+def measure(build: Callable[[], Any]) -> Dict[str, float]:
+    # Timed separately, tracemalloc slows allocation down several times
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del result
+    return {"seconds": elapsed, "bytes": current, "allocations": blocks}
+
+
+def bench_encode(model: Any, encoder: Any, count: int, as_rows: bool = False) -> float:
+    trades = [model.Trade("KELP", 2000 + i % 7, 3, "SUBMISSION", "", i) for i in range(count)]
+    start = time.perf_counter()
+    # as_rows is the Logger's path: tuples built by compact.rows, then plain encoding
+    json.dumps(compact.rows(trades) if as_rows else trades, cls=encoder, separators=(",", ":"))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory and allocation cost of the datamodel classes")
+    parser.add_argument("--ticks", type=int, default=50_000)
+    args = parser.parse_args()
+
+    scale = SCALE_TO / args.ticks
+    rows = {
+        "datamodel": measure(lambda: build_ticks(datamodel, args.ticks)),
+        "compact": measure(lambda: build_ticks(compact, args.ticks)),
+    }
+
+    print(f"per {SCALE_TO:,} ticks ({len(PRODUCTS)} products), extrapolated from {args.ticks:,}")
+    print(f"{'variant':<10} {'MiB':>10} {'allocations':>14} {'seconds':>9}")
+    for name, row in rows.items():
+        print(f"{name:<10} {row['bytes'] * scale / 2 ** 20:>10.1f} {row['allocations'] * scale:>14,.0f} {row['seconds'] * scale:>9.2f}")
+
+    saved = 1 - rows["compact"]["bytes"] / rows["datamodel"]["bytes"]
+    print(f"memory saved: {saved:.0%}")
+
+    original = bench_encode(datamodel, datamodel.ProsperityEncoder, args.ticks)
+    fast = bench_encode(compact, compact.CompactEncoder, args.ticks)
+    fastest = bench_encode(compact, compact.CompactEncoder, args.ticks, as_rows=True)
+    print(f"encode {args.ticks:,} trades: ProsperityEncoder {original * 1e3:.1f} ms (dicts), "
+          f"CompactEncoder {fast * 1e3:.1f} ms (arrays), compact.rows {fastest * 1e3:.1f} ms (arrays)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from src.model.datamodel import Listing, Observation, Order, OrderDepth, Symbol, Trade, TradingState
+from src.model.logger import DISABLED, EAGER, LAZY, Logger
+
+PRODUCTS = ("RAINFOREST_RESIN", "KELP", "SQUID_INK")
+
+
+class LegacyLogger(Logger):
+    """The original flush: serialises the whole state once to measure it and again to print it."""
+
+    def encode(self, state: TradingState, orders: Dict[Symbol, List[Order]], conversions: int, trader_data: str) -> str:
+        base_length = len(
+            self.to_json(
+                [
+                    self.compress_state(state, ""),
+                    self.compress_orders(orders),
+                    conversions,
+                    "",
+                    "",
+                ]
+            )
+        )
+
+        max_item_length = (self.max_log_length - base_length) // 3
+
+        return self.to_json(
+            [
+                self.compress_state(state, self.truncate(
+                    state.traderData, max_item_length)),
+                self.compress_orders(orders),
+                conversions,
+                self.truncate(trader_data, max_item_length),
+                self.truncate(self.logs, max_item_length),
+            ]
+        )
+
+
+def build_state(levels: int, trades: int) -> TradingState:
+    order_depths = {}
+    own_trades = {}
+    market_trades = {}
+    for product in PRODUCTS:
+        depth = OrderDepth()
+        for level in range(levels):
+            depth.buy_orders[9998 - level] = 5 + level
+            depth.sell_orders[10002 + level] = -5 - level
+        order_depths[product] = depth
+        own_trades[product] = [Trade(product, 10000, 2, "SUBMISSION", "", 100) for _ in range(trades)]
+        market_trades[product] = [Trade(product, 10001, 3, "", "", 100) for _ in range(trades)]
+
+    return TradingState(
+        '{"purchase_history": {"KELP": {"2025": 10, "2026": 4}}}' * 20,
+        100,
+        {product: Listing(product, product, "SEASHELLS") for product in PRODUCTS},
+        order_depths,
+        own_trades,
+        market_trades,
+        {product: 10 for product in PRODUCTS},
+        Observation({}, {}),
+    )
+
+
+def bench(logger: Logger, state: TradingState, orders: Dict[Symbol, List[Order]], repeat: int) -> float:
+    logs = "BUY 5x 9998\n" * 200
+    start = time.perf_counter()
+    for _ in range(repeat):
+        logger.logs = logs
+        logger.encode(state, orders, 0, state.traderData)
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_modes(state: TradingState, orders: Dict[Symbol, List[Order]], prints: int, repeat: int) -> Dict[str, float]:
+    """Per-tick cost of `prints` logger.print calls plus the flush, in each logger mode."""
+    timings = {}
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for mode in (EAGER, LAZY, DISABLED):
+            logger = Logger(mode)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for i in range(prints):
+                    logger.print("BUY", str(5) + "x", 9998 - i % 3, state.position)
+                logger.flush(state, orders, 0, state.traderData)
+            timings[mode] = (time.perf_counter() - start) / repeat
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-tick cost of Logger.flush serialisation")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    orders = {product: [Order(product, 9999, 5), Order(product, 10001, -5)] for product in PRODUCTS}
+    legacy = LegacyLogger()
+    single = Logger()
+
+    print(f"{'levels':>6} {'trades':>6} {'legacy us':>10} {'single us':>10} {'speedup':>8}")
+    for levels, trades in ((3, 0), (10, 10), (30, 50), (100, 200)):
+        state = build_state(levels, trades)
+
+        legacy.logs = single.logs = "BUY 5x 9998\n" * 200
+        if legacy.encode(state, orders, 0, state.traderData) != single.encode(state, orders, 0, state.traderData):
+            raise AssertionError("single pass output differs from the legacy flush")
+
+        before = bench(legacy, state, orders, args.repeat)
+        after = bench(single, state, orders, args.repeat)
+        print(f"{levels:>6} {trades:>6} {before * 1e6:>10.1f} {after * 1e6:>10.1f} {before / after:>7.2f}x")
+
+    state = build_state(3, 0)
+    # Past LAZY_CAPACITY the lazy buffer is compacted and then stops, which must keep the same start
+    for prints in (500, 2000, 5000):
+        eager, lazy = Logger(EAGER), Logger(LAZY)
+        for i in range(prints):
+            eager.print("SELL", i)
+            lazy.print("SELL", i)
+        if eager.encode(state, orders, 0, "") != lazy.encode(state, orders, 0, ""):
+            raise AssertionError(f"lazy logger output differs from the eager logger after {prints} prints")
+
+    print()
+    print(f"{'prints':>6} {'eager us':>10} {'lazy us':>10} {'disabled us':>12}")
+    for prints in (10, 100, 1000):
+        timings = bench_modes(state, orders, prints, max(args.repeat // 10, 1))
+        print(f"{prints:>6} {timings[EAGER] * 1e6:>10.1f} {timings[LAZY] * 1e6:>10.1f} {timings[DISABLED] * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import jsonpickle
+
+from src.model import trader_data
+from src.model.lots import LotBook
+
+
+class LegacyPurchaseHistory:
+
+    def __init__(self) -> None:
+        self.purchases: Dict[str, Dict[int, int]] = {}
+
+
+class LegacyTraderDataObject:
+    """The jsonpickle round trip refined_model.TraderDataObject used before the compact codec."""
+
+    def __init__(self) -> None:
+        self.purchase_history = LegacyPurchaseHistory()
+
+    def to_json_string(self) -> str:
+        return jsonpickle.encode(self)
+
+    @classmethod
+    def from_json_string(cls, json_string: str) -> "LegacyTraderDataObject":
+        obj = jsonpickle.decode(json_string)
+        for product, price_dict in obj.purchase_history.purchases.items():
+            obj.purchase_history.purchases[product] = {int(price): int(quantity) for price, quantity in price_dict.items()}
+        return obj
+
+
+def build_purchases(lots: int) -> Dict[str, Dict[int, int]]:
+    return {
+        "KELP": {2000 + i: 1 + i % 7 for i in range(lots)},
+        "SQUID_INK": {1900 + i: 2 + i % 5 for i in range(lots)},
+    }
+
+
+def legacy_round_trip(purchases: Dict[str, Dict[int, int]]) -> Tuple[Callable[[], Any], str]:
+    obj = LegacyTraderDataObject()
+    obj.purchase_history.purchases = purchases
+    encoded = obj.to_json_string()
+
+    def run() -> Any:
+        return LegacyTraderDataObject.from_json_string(obj.to_json_string())
+
+    return run, encoded
+
+
+def compact_round_trip(purchases: Dict[str, Dict[int, int]]) -> Tuple[Callable[[], Any], str]:
+    lots = {}
+    for product, prices in purchases.items():
+        lots[product] = LotBook()
+        for price, quantity in prices.items():
+            lots[product].add(price, quantity)
+    encoded = trader_data.dumps([trader_data.encode_lots(lots)])
+
+    def run() -> Any:
+        fields = trader_data.loads(trader_data.dumps([trader_data.encode_lots(lots)]))
+        return trader_data.decode_lots(fields[0])
+
+    return run, encoded
+
+
+def bench(run: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="traderData encode+decode cost per tick")
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'lots':>6} {'jsonpickle us':>14} {'compact us':>11} {'jsonpickle chars':>17} {'compact chars':>14}")
+    for lots in (0, 10, 100, 1000):
+        purchases = build_purchases(lots)
+        legacy, legacy_encoded = legacy_round_trip(purchases)
+        compact, compact_encoded = compact_round_trip(purchases)
+
+        decoded = {product: book.to_dict() for product, book in compact().items()}
+        if decoded != {product: prices for product, prices in legacy().purchase_history.purchases.items() if prices}:
+            raise AssertionError("compact codec does not round trip the purchase history")
+
+        repeat = max(args.repeat // max(lots, 1), 10)
+        print(f"{lots:>6} {bench(legacy, repeat) * 1e6:>14.1f} {bench(compact, repeat) * 1e6:>11.1f} "
+              f"{len(legacy_encoded):>17} {len(compact_encoded):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.backtest.engine import ROOT_DIR, BookLevels, MarketData, load_trader, run_backtest
+from src.data.prices import find_price_files
+from src.model.datamodel import Listing, Observation, Order, TradingState
+from src.model.logger import DISABLED, EAGER, Logger, logger
+from src.model.sorted_depth import SortedDepth
+
+# Replays every Trader over the bundled price files and times the hot paths of
+# refined_model.Trader on the same books. Results are written as JSON named after the
+# commit so runs can be compared with --compare.
+
+TRADERS = (
+    "refined_model.py",
+    "kelp.py",
+    "rainforest_resin.py",
+    "kelp copy.py",
+    "src/strategies/trader.py",
+    "src/strategies/trader_MM.py",
+    "src/strategies/kelp.py",
+    "src/strategies/rainforest_resin.py",
+    "src/strategies/trader_registry.py",
+)
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# Lots held per product when timing process_sell_orders and traderData round trips
+HISTORY_LOTS = (10, 100)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(run: Callable[[], Any], calls: int, rounds: int) -> Dict[str, float]:
+    """run() performs `calls` operations; report the mean and best round per operation."""
+    seconds = []
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        run()
+        seconds.append((time.perf_counter_ns() - start) / calls)
+    return {"calls": calls, "mean_us": float(np.mean(seconds)) / 1e3, "best_us": min(seconds) / 1e3}
+
+
+def bench_replays(paths: List[str], data: MarketData, rounds: int) -> Dict[str, Dict[str, Any]]:
+    ticks = len(data)
+    results = {}
+    for path in paths:
+        try:
+            seconds = []
+            for _ in range(rounds):
+                trader = load_trader(os.path.join(ROOT_DIR, path))
+                start = time.perf_counter()
+                result = run_backtest(trader, data)
+                seconds.append(time.perf_counter() - start)
+        except Exception as e:
+            # Some upload snapshots do not survive a replay, keep the rest of the suite going
+            results[path] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+
+        best = min(seconds)
+        results[path] = {
+            "ticks": ticks,
+            "seconds": best,
+            "tick_us": best / ticks * 1e6,
+            "pnl": sum(result.final_pnl().values()),
+        }
+    return results
+
+
+def build_depths(data: MarketData) -> List[SortedDepth]:
+    depths = []
+    for product in data.products:
+        book = BookLevels(data, product)
+        for tick, present in enumerate(book.present):
+            if present:
+                depth = SortedDepth(book.order_depth(tick))
+                if depth.two_sided:
+                    depths.append(depth)
+    return depths
+
+
+def build_history(model: Any, product: str, lots: int) -> Any:
+    history = model.PurchaseHistory()
+    for i in range(lots):
+        history.add_purchase(product, 1990 + i % 40, 1 + i % 5)
+    return history
+
+
+def bench_pricing(model: Any, depths: List[SortedDepth], rounds: int) -> Dict[str, Dict[str, float]]:
+    trader = model.Trader()
+
+    def expected_price() -> None:
+        for depth in depths:
+            trader.calculate_expected_price(depth)
+
+    def weighted_price() -> None:
+        for depth in depths:
+            trader.weighted_price(depth)
+
+    return {
+        "calculate_expected_price": timed(expected_price, len(depths), rounds),
+        "weighted_price": timed(weighted_price, len(depths), rounds),
+    }
+
+
+def bench_sell_orders(model: Any, depths: List[SortedDepth], rounds: int) -> Dict[str, Dict[str, float]]:
+    trader = model.Trader()
+    results = {}
+    for lots in HISTORY_LOTS:
+        flat = build_history(model, "KELP", lots).lots["KELP"].to_flat()
+        timings = []
+        for _ in range(rounds):
+            # process_sell_orders consumes lots, every call gets its own copy
+            histories = [model.PurchaseHistory() for _ in depths]
+            for history in histories:
+                history.lots["KELP"] = model.LotBook.from_flat(flat)
+
+            start = time.perf_counter_ns()
+            for depth, history in zip(depths, histories):
+                trader.process_sell_orders("KELP", depth, history, 0)
+            timings.append((time.perf_counter_ns() - start) / len(depths))
+        results[f"process_sell_orders[{lots}]"] = {
+            "calls": len(depths),
+            "mean_us": float(np.mean(timings)) / 1e3,
+            "best_us": min(timings) / 1e3,
+        }
+    return results
+
+
+def bench_flush(data: MarketData, rounds: int) -> Dict[str, Dict[str, float]]:
+    books = {product: BookLevels(data, product) for product in data.products}
+    listings = {product: Listing(product, product, "SEASHELLS") for product in data.products}
+    trader_data = '[1,{"KELP":[2025,10,2026,4]}]'
+
+    states = []
+    orders = []
+    for tick in range(0, len(data), max(len(data) // 1000, 1)):
+        order_depths = {product: book.order_depth(tick) for product, book in books.items() if book.present[tick]}
+        states.append(TradingState(trader_data, tick * 100, listings, order_depths, {}, {}, {}, Observation({}, {})))
+        orders.append({product: [Order(product, 9999, 5), Order(product, 10001, -5)] for product in order_depths})
+
+    flush_logger = Logger(EAGER)
+
+    def flush() -> None:
+        for state, tick_orders in zip(states, orders):
+            flush_logger.print("BUY", "5x", 9999)
+            flush_logger.print("SELL", "5x", 10001)
+            flush_logger.flush(state, tick_orders, 0, trader_data)
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        return {"Logger.flush": timed(flush, len(states), rounds)}
+
+
+def bench_trader_data(model: Any, rounds: int, repeat: int = 1000) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for lots in HISTORY_LOTS:
+        obj = model.TraderDataObject()
+        obj.purchase_history = build_history(model, "KELP", lots)
+        encoded = obj.to_json_string()
+
+        def encode() -> None:
+            for _ in range(repeat):
+                obj.to_json_string()
+
+        def decode() -> None:
+            for _ in range(repeat):
+                # Fields are decoded on first access
+                model.TraderDataObject.from_json_string(encoded).purchase_history
+
+        def unchanged() -> None:
+            for _ in range(repeat):
+                model.TraderDataObject.from_json_string(encoded).to_json_string()
+
+        results[f"TraderDataObject.encode[{lots}]"] = timed(encode, repeat, rounds)
+        results[f"TraderDataObject.decode[{lots}]"] = timed(decode, repeat, rounds)
+        results[f"TraderDataObject.unchanged[{lots}]"] = timed(unchanged, repeat, rounds)
+    return results
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    lines = [f"{'benchmark':<44} {'before us':>10} {'after us':>10} {'speedup':>8}"]
+    for name, row in current["replay"].items():
+        before = previous.get("replay", {}).get(name, {})
+        if "tick_us" in row and "tick_us" in before:
+            lines.append(f"{'replay ' + name:<44} {before['tick_us']:>10.1f} {row['tick_us']:>10.1f} "
+                         f"{before['tick_us'] / row['tick_us']:>7.2f}x")
+    for name, row in current["micro"].items():
+        before = previous.get("micro", {}).get(name)
+        if before:
+            lines.append(f"{name:<44} {before['best_us']:>10.2f} {row['best_us']:>10.2f} "
+                         f"{before['best_us'] / row['best_us']:>7.2f}x")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay and microbenchmark suite, written as JSON")
+    parser.add_argument("prices", nargs="*", help="price files, defaults to every price file under data/")
+    parser.add_argument("--traders", nargs="+", default=list(TRADERS), help="strategy files relative to the repo root")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="JSON file to write, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="earlier JSON result to print speedups against")
+    parser.add_argument("--skip-replay", action="store_true")
+    args = parser.parse_args()
+
+    # Read before writing, the output may be the same file when the commit has not changed
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    prices = args.prices or find_price_files(os.path.join(ROOT_DIR, "data"))
+    data = MarketData.from_files(prices)
+
+    # refined_model imports the top-level datamodel
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    import refined_model
+
+    depths = build_depths(data)
+    micro = {}
+    # Nothing flushes the shared logger between these calls, it would only grow
+    previous_mode = logger.mode
+    logger.set_mode(DISABLED)
+    try:
+        micro.update(bench_pricing(refined_model, depths, args.rounds))
+        micro.update(bench_sell_orders(refined_model, depths, args.rounds))
+    finally:
+        logger.set_mode(previous_mode)
+    micro.update(bench_flush(data, args.rounds))
+    micro.update(bench_trader_data(refined_model, args.rounds))
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "prices": [os.path.relpath(path, ROOT_DIR) for path in prices],
+        "replay": {} if args.skip_replay else bench_replays(args.traders, data, args.rounds),
+        "micro": micro,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(commit or 'worktree')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'replay':<44} {'tick us':>10} {'pnl':>10}")
+    for name, row in results["replay"].items():
+        if "error" in row:
+            print(f"{name:<44} {row['error']}")
+        else:
+            print(f"{name:<44} {row['tick_us']:>10.1f} {row['pnl']:>10.1f}")
+    print()
+    print(f"{'micro':<44} {'calls':>10} {'best us':>10}")
+    for name, row in micro.items():
+        print(f"{name:<44} {row['calls']:>10} {row['best_us']:>10.2f}")
+
+    if previous is not None:
+        print()
+        print("\n".join(compare(previous, results)))
+
+    print()
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
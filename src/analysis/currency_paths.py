@@ -0,0 +1,90 @@
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+# Best conversion paths through a table of exchange rates, rates[i][j] being what one unit of
+# currency i buys of currency j. A path of length L makes L trades; its multiplier is the
+# product of the rates along it. Dynamic programming over log rates keeps the k best paths
+# into every currency after each trade: O(L * n^2 * k log k) instead of n^(L-1) paths.
+
+# (currencies visited, start and end included; multiplier)
+CurrencyPath = Tuple[Tuple[int, ...], float]
+
+
+def _log_rates(rates: Sequence[Sequence[float]]) -> List[List[float]]:
+    n = len(rates)
+    if any(len(row) != n for row in rates):
+        raise ValueError("rates must be a square matrix")
+    # Rates of 0 or less are trades that cannot be made
+    return [[math.log(rate) if rate > 0 else -math.inf for rate in row] for row in rates]
+
+
+def best_paths(rates: Sequence[Sequence[float]], start: int, end: int = None, max_length: int = 5,
+               k: int = 1, min_length: int = 1) -> List[CurrencyPath]:
+    """
+    The k best paths from start to end (start by default) making between min_length and
+    max_length trades, best first. Accepts lists or numpy arrays.
+    """
+    end = start if end is None else end
+    log_rates = _log_rates(rates)
+    n = len(log_rates)
+    if not 0 <= start < n or not 0 <= end < n:
+        raise ValueError("start and end must be currency indices")
+    if k < 1 or min_length < 1 or max_length < min_length:
+        raise ValueError("need k >= 1 and 1 <= min_length <= max_length")
+
+    # layers[t][v]: the k best (log multiplier, previous currency, rank in layers[t-1][previous])
+    # of paths making t trades and ending in v
+    layers: List[List[List[Tuple[float, int, int]]]] = [[[] for _ in range(n)]]
+    layers[0][start] = [(0.0, -1, -1)]
+
+    for _ in range(max_length):
+        previous = layers[-1]
+        layer = []
+        for v in range(n):
+            candidates = (
+                (score + log_rates[u][v], u, rank)
+                for u in range(n)
+                if log_rates[u][v] > -math.inf
+                for rank, (score, _, _) in enumerate(previous[u])
+            )
+            layer.append(heapq.nlargest(k, candidates, key=lambda entry: entry[0]))
+        layers.append(layer)
+
+    finals = heapq.nlargest(
+        k,
+        (
+            (score, length, rank)
+            for length in range(min_length, max_length + 1)
+            for rank, (score, _, _) in enumerate(layers[length][end])
+        ),
+        key=lambda entry: entry[0],
+    )
+
+    paths = []
+    for _, length, rank in finals:
+        nodes = [end]
+        v = end
+        for t in range(length, 0, -1):
+            _, u, rank = layers[t][v][rank]
+            nodes.append(u)
+            v = u
+        nodes.reverse()
+        paths.append((tuple(nodes), path_multiplier(rates, nodes)))
+    return paths
+
+
+def best_path(rates: Sequence[Sequence[float]], start: int, end: int = None, max_length: int = 5,
+              min_length: int = 1) -> CurrencyPath:
+    paths = best_paths(rates, start, end, max_length, 1, min_length)
+    if not paths:
+        raise ValueError("no path between these currencies")
+    return paths[0]
+
+
+def path_multiplier(rates: Sequence[Sequence[float]], nodes: Sequence[int]) -> float:
+    """Product of the rates along nodes, multiplied directly rather than through logs."""
+    multiplier = 1.0
+    for frm, to in zip(nodes, nodes[1:]):
+        multiplier *= float(rates[frm][to])
+    return multiplier
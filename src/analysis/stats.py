@@ -0,0 +1,347 @@
+import json
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.data.cache import cache_dir, source_key
+from src.data.prices import PriceTable, load_prices
+from src.model.datamodel import Product
+
+# Per (day, product) statistics of price file columns in one pass over each file. Values are
+# fed to mergeable accumulators a chunk at a time: Welford/Chan moments, exact value counts for
+# quantiles (prices take few distinct values) and lagged co-moments for autocorrelation. The
+# accumulator states are cached next to each file, so only new or changed files are read.
+
+STATS_CACHE_VERSION = 2
+STATS_CACHE_FILE = "stats.json"
+
+CHUNK_SIZE = 65536
+
+DEFAULT_COLUMNS = ("mid_price",)
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_LAGS = (1,)
+
+# Exchange files write 0 where a price is missing: mid_price of a one-sided book, and the price
+# and volume of absent book levels. In every other column, e.g. profit_and_loss, 0 is a value.
+MISSING = 0.0
+PRICE_COLUMN_PREFIXES = ("bid_price_", "ask_price_")
+VOLUME_COLUMN_PREFIXES = ("bid_volume_", "ask_volume_")
+
+Group = Tuple[int, Product]
+
+
+class RunningMoments:
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    def to_state(self) -> List[float]:
+        return [self.count, self.mean, self.m2, self.min, self.max]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> "RunningMoments":
+        moments = cls()
+        moments.count, moments.mean, moments.m2, moments.min, moments.max = state
+        moments.count = int(moments.count)
+        return moments
+
+
+class RunningCovariance:
+    """Co-moment of (x, y) pairs, merged with Chan's formula."""
+    __slots__ = ("count", "mean_x", "mean_y", "c", "m2_x", "m2_y")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.c = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> None:
+        if len(x) == 0:
+            return
+        batch = RunningCovariance()
+        batch.count = len(x)
+        batch.mean_x = float(x.mean())
+        batch.mean_y = float(y.mean())
+        dx = x - batch.mean_x
+        dy = y - batch.mean_y
+        batch.c = float((dx * dy).sum())
+        batch.m2_x = float((dx * dx).sum())
+        batch.m2_y = float((dy * dy).sum())
+        self.merge(batch)
+
+    def merge(self, other: "RunningCovariance") -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.count * other.count / count
+        self.c += other.c + delta_x * delta_y * weight
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.mean_x += delta_x * other.count / count
+        self.mean_y += delta_y * other.count / count
+        self.count = count
+
+    @property
+    def correlation(self) -> float:
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return self.c / denominator if denominator > 0 else float("nan")
+
+    def to_state(self) -> List[float]:
+        return [self.count, self.mean_x, self.mean_y, self.c, self.m2_x, self.m2_y]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> "RunningCovariance":
+        covariance = cls()
+        covariance.count, covariance.mean_x, covariance.mean_y, covariance.c, covariance.m2_x, covariance.m2_y = state
+        covariance.count = int(covariance.count)
+        return covariance
+
+
+class ValueCounts:
+    """Exact counts of every distinct value, enough for exact quantiles of price series."""
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts: Dict[float, int] = {}
+
+    def update(self, values: np.ndarray) -> None:
+        unique, counts = np.unique(values, return_counts=True)
+        for value, count in zip(unique.tolist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def merge(self, other: "ValueCounts") -> None:
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Same as np.quantile with the default linear interpolation."""
+        if not self.counts:
+            return [float("nan")] * len(qs)
+        values = np.array(sorted(self.counts))
+        ends = np.cumsum([self.counts[value] for value in values])
+        n = int(ends[-1])
+
+        result = []
+        for q in qs:
+            position = (n - 1) * q
+            lower = int(np.floor(position))
+            upper = min(lower + 1, n - 1)
+            # Value of the element at each rank, located through the cumulative counts
+            low_value = values[np.searchsorted(ends, lower, side="right")]
+            high_value = values[np.searchsorted(ends, upper, side="right")]
+            result.append(float(low_value + (high_value - low_value) * (position - lower)))
+        return result
+
+    def to_state(self) -> List[List[float]]:
+        return [list(self.counts), list(self.counts.values())]
+
+    @classmethod
+    def from_state(cls, state: List[List[float]]) -> "ValueCounts":
+        counts = cls()
+        counts.counts = dict(zip(state[0], (int(count) for count in state[1])))
+        return counts
+
+
+class ColumnStats:
+    """Every accumulator of one column of one (day, product) group."""
+
+    def __init__(self, lags: Sequence[int] = DEFAULT_LAGS) -> None:
+        self.moments = RunningMoments()
+        self.values = ValueCounts()
+        self.lags = {lag: RunningCovariance() for lag in lags}
+        # Last values of the previous chunk, paired with the start of the next one
+        self.tail = np.empty(0)
+        self.tail_missing = np.empty(0, dtype=bool)
+
+    def update(self, values: np.ndarray, missing: np.ndarray = None) -> None:
+        """missing flags values to leave out; lag pairs are taken before dropping them, so a
+        pair straddling a missing value is dropped rather than joined across it."""
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.zeros(len(values), dtype=bool) if missing is None else np.asarray(missing, dtype=bool)
+        present = values[~missing]
+        self.moments.update(present)
+        self.values.update(present)
+
+        extended = np.concatenate((self.tail, values))
+        extended_missing = np.concatenate((self.tail_missing, missing))
+        for lag, covariance in self.lags.items():
+            # Pairs whose later element is in this chunk
+            start = max(len(self.tail), lag)
+            keep = ~(extended_missing[start - lag:len(extended) - lag] | extended_missing[start:])
+            covariance.update(extended[start - lag:len(extended) - lag][keep], extended[start:][keep])
+        if self.lags:
+            self.tail = extended[-max(self.lags):]
+            self.tail_missing = extended_missing[-max(self.lags):]
+
+    def merge(self, other: "ColumnStats") -> None:
+        """Adds another stretch of the same series; pairs across the two stretches are not counted."""
+        self.moments.merge(other.moments)
+        self.values.merge(other.values)
+        for lag, covariance in self.lags.items():
+            covariance.merge(other.lags[lag])
+        self.tail = other.tail
+        self.tail_missing = other.tail_missing
+
+    def result(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        moments = self.moments
+        variance = moments.variance
+        return {
+            "count": moments.count,
+            "mean": moments.mean if moments.count else float("nan"),
+            "variance": variance,
+            "std": float(np.sqrt(variance)),
+            "min": moments.min if moments.count else float("nan"),
+            "max": moments.max if moments.count else float("nan"),
+            "quantiles": dict(zip(quantiles, self.values.quantiles(quantiles))),
+            "autocorrelation": {lag: covariance.correlation for lag, covariance in self.lags.items()},
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "moments": self.moments.to_state(),
+            "values": self.values.to_state(),
+            "lags": {str(lag): covariance.to_state() for lag, covariance in self.lags.items()},
+            "tail": self.tail.tolist(),
+            "tail_missing": self.tail_missing.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ColumnStats":
+        stats = cls(())
+        stats.moments = RunningMoments.from_state(state["moments"])
+        stats.values = ValueCounts.from_state(state["values"])
+        stats.lags = {int(lag): RunningCovariance.from_state(values) for lag, values in state["lags"].items()}
+        stats.tail = np.array(state["tail"], dtype=np.float64)
+        stats.tail_missing = np.array(state["tail_missing"], dtype=bool)
+        return stats
+
+
+FileStats = Dict[Group, Dict[str, ColumnStats]]
+
+
+def missing_values(table: PriceTable, column: str) -> np.ndarray:
+    """Rows of table where column holds no value."""
+    if column == "mid_price" or column.startswith(PRICE_COLUMN_PREFIXES):
+        return np.asarray(table[column]) == MISSING
+    if column.startswith(VOLUME_COLUMN_PREFIXES):
+        # An absent level has volume 0 too, but so can no present one
+        return np.asarray(table[column.replace("_volume_", "_price_")]) == MISSING
+    return np.isnan(np.asarray(table[column], dtype=np.float64))
+
+
+def file_stats(path: str, columns: Sequence[str] = DEFAULT_COLUMNS, lags: Sequence[int] = DEFAULT_LAGS,
+               chunk_size: int = CHUNK_SIZE) -> FileStats:
+    """Accumulators per (day, product) and column of one price file, read a chunk at a time."""
+    groups: FileStats = {}
+    for product, table in load_prices(path).items():
+        missing = {column: missing_values(table, column) for column in columns}
+        days = table["day"]
+        # Rows of a file are in day order, each day is one contiguous run
+        starts = np.flatnonzero(np.insert(days[1:] != days[:-1], 0, True))
+        ends = np.append(starts[1:], len(days))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            group = groups.setdefault((int(days[start]), product), {column: ColumnStats(lags) for column in columns})
+            for column in columns:
+                stats = group[column]
+                for chunk_start in range(start, end, chunk_size):
+                    chunk = slice(chunk_start, min(chunk_start + chunk_size, end))
+                    stats.update(table[column][chunk], missing[column][chunk])
+    return groups
+
+
+def _cache_key(columns: Sequence[str], lags: Sequence[int]) -> str:
+    return json.dumps([STATS_CACHE_VERSION, list(columns), list(lags)])
+
+
+def cached_file_stats(path: str, columns: Sequence[str] = DEFAULT_COLUMNS, lags: Sequence[int] = DEFAULT_LAGS) -> FileStats:
+    """file_stats, read from or written to <path>.npcache/stats.json."""
+    cache_path = os.path.join(cache_dir(path), STATS_CACHE_FILE)
+    key = _cache_key(columns, lags)
+
+    entries = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("source") == source_key(path):
+            entries = cached.get("entries", {})
+            if key in entries:
+                return {
+                    (int(day), product): {column: ColumnStats.from_state(state) for column, state in group.items()}
+                    for day, product, group in entries[key]
+                }
+
+    groups = file_stats(path, columns, lags)
+
+    # load_prices has created the cache directory; other column/lag choices stay cached alongside
+    entries[key] = [
+        [day, product, {column: stats.to_state() for column, stats in group.items()}]
+        for (day, product), group in groups.items()
+    ]
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source_key(path), "entries": entries}, f)
+    os.replace(tmp_path, cache_path)
+
+    return groups
+
+
+def grouped_stats(paths: Sequence[str], columns: Sequence[str] = DEFAULT_COLUMNS,
+                  quantiles: Sequence[float] = DEFAULT_QUANTILES, lags: Sequence[int] = DEFAULT_LAGS,
+                  use_cache: bool = True) -> Dict[Group, Dict[str, Dict[str, Any]]]:
+    """
+    {(day, product): {column: stats}} over every price file, stats holding count, mean,
+    variance, std, min, max, quantiles and lag autocorrelations. Missing prices (0) are skipped,
+    see missing_values.
+    """
+    merged: FileStats = {}
+    for path in paths:
+        groups = cached_file_stats(path, columns, lags) if use_cache else file_stats(path, columns, lags)
+        for group, by_column in groups.items():
+            if group not in merged:
+                merged[group] = by_column
+                continue
+            for column, stats in by_column.items():
+                merged[group][column].merge(stats)
+
+    return {
+        group: {column: stats.result(quantiles) for column, stats in by_column.items()}
+        for group, by_column in sorted(merged.items())
+    }
@@ -0,0 +1,384 @@
+import argparse
+import importlib.util
+import os
+import sys
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.backtest.matching import SUBMISSION, match_orders
+from src.backtest.pnl import batch_pnl
+from src.data.prices import BOOK_DEPTH, PriceTable, load_prices
+from src.data.stream import session_of
+from src.data.trades import EMPTY, TradeIndex
+from src.model.compact import Listing, OrderDepth, Trade
+from src.model.datamodel import Observation, Product, Symbol, TradingState
+from src.model.logger import DISABLED, EAGER, logger
+from src.perf.timers import instrument
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Used to pack (round, day, timestamp) into one sortable key: rounds reuse day numbers, so the
+# session code round * ROUND_SCALE + day + DAY_OFFSET tells two rounds' day -1 apart
+KEY_SCALE = 10 ** 9
+ROUND_SCALE = 1000
+DAY_OFFSET = ROUND_SCALE // 2
+DENOMINATION = "SEASHELLS"
+
+DEFAULT_LIMITS = {
+    "RAINFOREST_RESIN": 50,
+    "KELP": 50,
+    "SQUID_INK": 50,
+}
+
+
+def load_module(path: str) -> Any:
+    """Import a strategy file by path."""
+    # Top-level strategies import `datamodel` directly, src ones import `src.model.datamodel`
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    name = "backtest_" + os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # jsonpickle resolves `py/object` tags in traderData through sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def tick_keys(rounds: np.ndarray, days: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    sessions = np.asarray(rounds, dtype=np.int64) * ROUND_SCALE + np.asarray(days, dtype=np.int64) + DAY_OFFSET
+    return sessions * KEY_SCALE + np.asarray(timestamps, dtype=np.int64)
+
+
+def table_keys(table: PriceTable) -> np.ndarray:
+    """Tick keys of a table's rows; tables without a round column are round 0."""
+    rounds = table["round"] if "round" in table else 0
+    return tick_keys(rounds, table["day"], table["timestamp"])
+
+
+def load_trader(path: str) -> Any:
+    """Import a strategy file by path and return a fresh instance of its Trader."""
+    return load_module(path).Trader()
+
+
+class MarketData:
+    """Price tables of several products aligned on one (round, day, timestamp) grid."""
+
+    # Per-product arrays, see arrays() and from_arrays()
+    PRODUCT_FIELDS = ("present", "bid_prices", "bid_volumes", "ask_prices", "ask_volumes", "mid_prices")
+
+    def __init__(self, tables: Dict[Product, PriceTable]) -> None:
+        self.products: List[Product] = sorted(tables)
+
+        product_keys = {product: table_keys(table) for product, table in tables.items()}
+        for product, keys in product_keys.items():
+            if len(np.unique(keys)) != len(keys):
+                raise ValueError(f"{product} has several rows for the same (round, day, timestamp)")
+        self.keys = np.unique(np.concatenate(list(product_keys.values())))
+        self._split_keys()
+
+        n = len(self.keys)
+        self.present: Dict[Product, np.ndarray] = {}
+        self.bid_prices: Dict[Product, np.ndarray] = {}
+        self.bid_volumes: Dict[Product, np.ndarray] = {}
+        self.ask_prices: Dict[Product, np.ndarray] = {}
+        self.ask_volumes: Dict[Product, np.ndarray] = {}
+        self.mid_prices: Dict[Product, np.ndarray] = {}
+
+        for product, table in tables.items():
+            rows = np.searchsorted(self.keys, product_keys[product])
+            present = np.zeros(n, dtype=bool)
+            present[rows] = True
+
+            self.present[product] = present
+            self.bid_prices[product] = self._scatter(rows, table.bid_prices(), n)
+            self.bid_volumes[product] = self._scatter(rows, table.bid_volumes(), n)
+            self.ask_prices[product] = self._scatter(rows, table.ask_prices(), n)
+            self.ask_volumes[product] = self._scatter(rows, table.ask_volumes(), n)
+
+            mid = np.full(n, np.nan)
+            mid[rows] = table["mid_price"]
+            # Exchange files write mid_price 0 when one side of the book is empty
+            mid[mid == 0] = np.nan
+            self.mid_prices[product] = _forward_fill(mid)
+
+    def _split_keys(self) -> None:
+        # One session per exchange run: every state resets where it changes
+        self.sessions = self.keys // KEY_SCALE
+        self.rounds = self.sessions // ROUND_SCALE
+        self.days = self.sessions % ROUND_SCALE - DAY_OFFSET
+        self.timestamps = self.keys % KEY_SCALE
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Every array a replay reads, keyed "keys" and "<field>/<product>"."""
+        arrays = {"keys": self.keys}
+        for field in self.PRODUCT_FIELDS:
+            for product, values in getattr(self, field).items():
+                arrays[f"{field}/{product}"] = values
+        return arrays
+
+    def take(self, rows: np.ndarray) -> "MarketData":
+        return MarketData.from_arrays({name: values[rows] for name, values in self.arrays().items()})
+
+    def day_prefix(self, fraction: float) -> "MarketData":
+        """The first `fraction` of every session's ticks, at least one per session."""
+        starts = np.flatnonzero(np.insert(self.sessions[1:] != self.sessions[:-1], 0, True))
+        lengths = np.diff(np.append(starts, len(self.keys)))
+        keep = np.maximum(np.ceil(lengths * fraction).astype(np.int64), 1)
+        offsets = np.arange(len(self.keys)) - np.repeat(starts, lengths)
+        return self.take(np.flatnonzero(offsets < np.repeat(keep, lengths)))
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "MarketData":
+        """Rebuild from arrays(), using the given arrays without copying them."""
+        data = cls.__new__(cls)
+        data.keys = arrays["keys"]
+        data._split_keys()
+
+        products = set()
+        for field in cls.PRODUCT_FIELDS:
+            setattr(data, field, {})
+        for name, values in arrays.items():
+            if "/" in name:
+                field, product = name.split("/", 1)
+                getattr(data, field)[product] = values
+                products.add(product)
+        data.products = sorted(products)
+        return data
+
+    @staticmethod
+    def _scatter(rows: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+        out = np.zeros((n, BOOK_DEPTH), dtype=np.int64)
+        out[rows] = values
+        return out
+
+    @classmethod
+    def from_files(cls, paths: List[str]) -> "MarketData":
+        return cls(load_tables(paths))
+
+
+def load_tables(paths: List[str]) -> Dict[Product, PriceTable]:
+    """
+    One PriceTable per product holding its rows from every file, in file order, with a round
+    column taken from prices_round_N_day_D.csv names (0 for other names).
+    """
+    tables: Dict[Product, List[PriceTable]] = {}
+    for path in paths:
+        round_ = session_of(path)[0]
+        for product, table in load_prices(path).items():
+            columns = dict(table.columns)
+            columns["round"] = np.full(len(table), round_, dtype=np.int64)
+            tables.setdefault(product, []).append(PriceTable(product, columns))
+
+    merged = {}
+    for product, parts in tables.items():
+        columns = {
+            column: np.concatenate([part[column] for part in parts])
+            for column in parts[0].columns
+        }
+        merged[product] = PriceTable(product, columns)
+    return merged
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    idx = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[idx]
+    # Leading gaps have nothing to carry forward
+    filled[np.isnan(filled)] = 0.0
+    return filled
+
+
+class BookLevels:
+    """Python-level copies of one product's book, converted from arrays once per replay."""
+
+    def __init__(self, data: MarketData, product: Product) -> None:
+        self.present = data.present[product].tolist()
+        self.bid_prices = data.bid_prices[product].tolist()
+        self.bid_volumes = data.bid_volumes[product].tolist()
+        self.ask_prices = data.ask_prices[product].tolist()
+        self.ask_volumes = data.ask_volumes[product].tolist()
+
+    def order_depth(self, tick: int) -> OrderDepth:
+        order_depth = OrderDepth()
+        for price, volume in zip(self.bid_prices[tick], self.bid_volumes[tick]):
+            if volume:
+                order_depth.buy_orders[price] = volume
+        for price, volume in zip(self.ask_prices[tick], self.ask_volumes[tick]):
+            if volume:
+                order_depth.sell_orders[price] = -volume
+        return order_depth
+
+
+class Fills:
+    """Append-only columnar record of simulated fills."""
+
+    def __init__(self) -> None:
+        self.ticks: List[int] = []
+        self.products: List[int] = []
+        self.prices: List[int] = []
+        self.quantities: List[int] = []
+
+    def add(self, tick: int, product_idx: int, price: int, quantity: int) -> None:
+        self.ticks.append(tick)
+        self.products.append(product_idx)
+        self.prices.append(price)
+        self.quantities.append(quantity)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.asarray(self.ticks, dtype=np.int64),
+            np.asarray(self.products, dtype=np.int64),
+            np.asarray(self.prices, dtype=np.int64),
+            np.asarray(self.quantities, dtype=np.int64),
+        )
+
+
+class BacktestResult:
+
+    def __init__(self, data: MarketData, fills: Fills) -> None:
+        self.products = data.products
+        self.sessions = data.sessions
+        self.rounds = data.rounds
+        self.days = data.days
+        self.timestamps = data.timestamps
+        self.fill_ticks, self.fill_products, self.fill_prices, self.fill_quantities = fills.arrays()
+
+        self.positions, self.cash, self.pnl = batch_pnl(
+            self.products, self.sessions, data.mid_prices,
+            self.fill_ticks, self.fill_products, self.fill_prices, self.fill_quantities,
+        )
+
+    @property
+    def total_pnl(self) -> np.ndarray:
+        return np.sum(list(self.pnl.values()), axis=0)
+
+    def day_ends(self) -> np.ndarray:
+        return np.flatnonzero(np.append(self.sessions[1:] != self.sessions[:-1], True))
+
+    def final_pnl(self) -> Dict[Product, float]:
+        """Realised plus marked PnL per product, summed over the end of every session."""
+        ends = self.day_ends()
+        return {product: float(pnl[ends].sum()) for product, pnl in self.pnl.items()}
+
+
+@contextmanager
+def replay_output(quiet: bool, log_mode: str) -> Iterator[None]:
+    """quiet discards anything printed; the shared logger runs in log_mode meanwhile."""
+    # Strategies log through the shared logger, which costs nothing while disabled
+    previous_mode = logger.mode
+    logger.set_mode(log_mode)
+
+    stdout = open(os.devnull, "w") if quiet else sys.stdout
+    try:
+        with redirect_stdout(stdout):
+            yield
+    finally:
+        logger.set_mode(previous_mode)
+        if quiet:
+            stdout.close()
+
+
+def run_backtest(trader: Any, data: MarketData, limits: Dict[Product, int] = None, quiet: bool = True,
+                 log_mode: str = DISABLED, market_trades: TradeIndex = None) -> BacktestResult:
+    """
+    Replay every tick of data through trader.run and simulate fills against the recorded book.
+    quiet discards anything printed; log_mode is the logger mode used during the replay.
+    Each state's market_trades are the trades printed at the previous tick of the same session.
+    """
+    limits = DEFAULT_LIMITS if limits is None else limits
+    books = {product: BookLevels(data, product) for product in data.products}
+    product_index = {product: idx for idx, product in enumerate(data.products)}
+    listings = {product: Listing(product, product, DENOMINATION) for product in data.products}
+    timestamps = data.timestamps.tolist()
+    sessions = data.sessions.tolist()
+    rounds = data.rounds.tolist()
+    days = data.days.tolist()
+
+    fills = Fills()
+    position: Dict[Product, int] = {}
+    own_trades: Dict[Symbol, List[Trade]] = {}
+    trader_data = ""
+
+    with replay_output(quiet, log_mode):
+        for tick, timestamp in enumerate(timestamps):
+            new_day = tick == 0 or sessions[tick] != sessions[tick - 1]
+            if new_day:
+                # Each day of each round is a separate exchange run
+                position = {}
+                own_trades = {}
+                trader_data = ""
+
+            if market_trades is None or new_day:
+                trades = EMPTY
+            else:
+                trades = market_trades.at(days[tick], timestamps[tick - 1], rounds[tick])
+
+            order_depths = {
+                product: book.order_depth(tick)
+                for product, book in books.items()
+                if book.present[tick]
+            }
+            state = TradingState(
+                trader_data,
+                timestamp,
+                listings,
+                order_depths,
+                own_trades,
+                trades,
+                dict(position),
+                Observation({}, {}),
+            )
+
+            orders, _, trader_data = trader.run(state)
+
+            # Strategies may mutate the depths they were given, so match against fresh ones
+            books_now = {product: books[product].order_depth(tick) for product in order_depths}
+            matched = match_orders(orders, books_now, position, limits, timestamp)
+            for product, trades in matched.own_trades.items():
+                for trade in trades:
+                    quantity = trade.quantity if trade.buyer == SUBMISSION else -trade.quantity
+                    fills.add(tick, product_index[product], trade.price, quantity)
+            position = matched.position
+            own_trades = matched.own_trades
+
+    return BacktestResult(data, fills)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay price files through a Trader")
+    parser.add_argument("strategy", help="path to a file defining Trader")
+    parser.add_argument("prices", nargs="+", help="semicolon separated price files")
+    parser.add_argument("--trades", nargs="+", default=[], help="trades_round_N_day_D.csv files for market_trades")
+    parser.add_argument("--profile", action="store_true", help="time the phases of run() and print percentiles")
+    args = parser.parse_args()
+
+    if args.profile:
+        instrument.enable()
+
+    # Profiling keeps the logger on so flush is measured as it runs on the exchange
+    log_mode = EAGER if args.profile else DISABLED
+    market_trades = TradeIndex.from_files(args.trades) if args.trades else None
+    trader = load_trader(args.strategy)
+    result = run_backtest(trader, MarketData.from_files(args.prices), log_mode=log_mode, market_trades=market_trades)
+    for product, pnl in result.final_pnl().items():
+        print(f"{product}: {pnl:.1f}")
+    print(f"TOTAL: {sum(result.final_pnl().values()):.1f}")
+
+    if args.profile:
+        print()
+        print(instrument.format_report())
+        # Strategies with a DeadlineGuard report how often they cut work short
+        if hasattr(trader, "deadline"):
+            print(trader.deadline.format_report())
+
+
+if __name__ == "__main__":
+    main()
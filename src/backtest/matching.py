@@ -0,0 +1,139 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.model.compact import Trade
+from src.model.datamodel import Order, OrderDepth, Position, Product, Symbol
+
+SUBMISSION = "SUBMISSION"
+
+
+class MatchResult:
+
+    def __init__(self) -> None:
+        self.own_trades: Dict[Symbol, List[Trade]] = {}
+        self.position: Dict[Product, Position] = {}
+        # Products whose whole order batch was cancelled for breaching the limit
+        self.rejected: List[Symbol] = []
+
+
+def exceeds_limit(orders: List[Order], position: int, limit: int) -> bool:
+    """Exchange rule: the batch is cancelled if all buys or all sells filling would breach the limit."""
+    total_buy = 0
+    total_sell = 0
+    for order in orders:
+        if order.quantity > 0:
+            total_buy += order.quantity
+        else:
+            total_sell -= order.quantity
+
+    return position + total_buy > limit or position - total_sell < -limit
+
+
+def match_product(orders: List[Order], order_depth: OrderDepth, timestamp: int = 0) -> List[Trade]:
+    """Fill orders aggressively, level by level, against a copy of order_depth."""
+    ask_prices = sorted(order_depth.sell_orders)
+    ask_volumes = [-order_depth.sell_orders[price] for price in ask_prices]
+    # Bids are kept ascending so bisect works; they are consumed from the end
+    bid_prices = sorted(order_depth.buy_orders)
+    bid_volumes = [order_depth.buy_orders[price] for price in bid_prices]
+
+    # Levels before ask_start / from bid_end onwards are exhausted
+    ask_start = 0
+    bid_end = len(bid_prices)
+
+    trades = []
+    for order in orders:
+        remaining = order.quantity
+        if remaining > 0:
+            stop = bisect_right(ask_prices, order.price)
+            level = ask_start
+            while remaining and level < stop:
+                quantity = min(remaining, ask_volumes[level])
+                if quantity:
+                    ask_volumes[level] -= quantity
+                    remaining -= quantity
+                    trades.append(Trade(order.symbol, ask_prices[level], quantity, SUBMISSION, "", timestamp))
+                if ask_volumes[level] == 0 and level == ask_start:
+                    ask_start += 1
+                level += 1
+        elif remaining < 0:
+            remaining = -remaining
+            stop = bisect_left(bid_prices, order.price)
+            level = bid_end - 1
+            while remaining and level >= stop:
+                quantity = min(remaining, bid_volumes[level])
+                if quantity:
+                    bid_volumes[level] -= quantity
+                    remaining -= quantity
+                    trades.append(Trade(order.symbol, bid_prices[level], quantity, "", SUBMISSION, timestamp))
+                if bid_volumes[level] == 0 and level == bid_end - 1:
+                    bid_end -= 1
+                level -= 1
+
+    return trades
+
+
+def match_orders(orders: Dict[Symbol, List[Order]],
+                 order_depths: Dict[Symbol, OrderDepth],
+                 position: Dict[Product, Position],
+                 limits: Dict[Product, int],
+                 timestamp: int = 0) -> MatchResult:
+    """Apply one tick of orders the way the exchange does, without mutating the inputs."""
+    result = MatchResult()
+    result.position = dict(position)
+
+    for symbol, symbol_orders in orders.items():
+        if not symbol_orders or symbol not in order_depths:
+            continue
+
+        current = position.get(symbol, 0)
+        if exceeds_limit(symbol_orders, current, limits.get(symbol, 0)):
+            result.rejected.append(symbol)
+            continue
+
+        trades = match_product(symbol_orders, order_depths[symbol], timestamp)
+        if not trades:
+            continue
+
+        for trade in trades:
+            current += trade.quantity if trade.buyer == SUBMISSION else -trade.quantity
+        result.own_trades[symbol] = trades
+        result.position[symbol] = current
+
+    return result
+
+
+def sweep_fills(bid_prices: np.ndarray,
+                bid_volumes: np.ndarray,
+                ask_prices: np.ndarray,
+                ask_volumes: np.ndarray,
+                order_prices: np.ndarray,
+                order_quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorised fills of one aggressive order per row against (rows, levels) books stored
+    best level first, as in the price files. Returns the signed filled quantity and the
+    signed cash spent per row.
+    """
+    buying = order_quantities > 0
+    wanted = np.abs(order_quantities)[:, None]
+
+    prices = np.where(buying[:, None], ask_prices, bid_prices)
+    volumes = np.where(buying[:, None], ask_volumes, bid_volumes)
+    crossing = np.where(buying[:, None], prices <= order_prices[:, None], prices >= order_prices[:, None])
+    available = np.where(crossing & (volumes > 0), volumes, 0)
+
+    # Quantity taken from each level is what is left of the order once the better levels are used
+    before = np.cumsum(available, axis=1) - available
+    taken = np.clip(wanted - before, 0, available)
+
+    sign = np.where(buying, 1, -1)
+    filled = taken.sum(axis=1) * sign
+    cash = -(taken * prices).sum(axis=1) * sign
+    return filled, cash
+
+
+def sweep_limit_mask(positions: np.ndarray, buy_totals: np.ndarray, sell_totals: np.ndarray, limit: int) -> np.ndarray:
+    """Vectorised exceeds_limit: True for rows whose order batch would be cancelled."""
+    return (positions + buy_totals > limit) | (positions - sell_totals < -limit)
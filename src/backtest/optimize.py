@@ -0,0 +1,219 @@
+import argparse
+import json
+import math
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from src.backtest.engine import MarketData
+from src.backtest.sweep import Grid, Overrides, SweepPool, param_grid
+
+# Both searches pick from the points of a sweep grid and count cost as Trader.run calls,
+# i.e. replayed ticks, so they can be compared against running the full grid.
+
+# evaluate(points, fraction) -> one result per point, as SweepPool.evaluate
+Evaluate = Callable[[List[Overrides], float], List[Dict[str, Any]]]
+
+ETA = 3
+RUNGS = 3
+
+BAYES_INITIAL = 4
+BAYES_BATCH = 2
+BAYES_PATIENCE = 3
+LENGTH_SCALE = 0.25
+NOISE = 1e-6
+
+
+class SearchResult:
+
+    def __init__(self, method: str, grid_size: int, full_ticks: int) -> None:
+        self.method = method
+        self.grid_size = grid_size
+        self.full_ticks = full_ticks
+        self.history: List[Dict[str, Any]] = []
+
+    def add(self, results: List[Dict[str, Any]]) -> None:
+        self.history.extend(results)
+
+    @property
+    def run_calls(self) -> int:
+        return sum(result["ticks"] for result in self.history)
+
+    @property
+    def best(self) -> Dict[str, Any]:
+        """Best result replayed over the full data, partial slices are not comparable."""
+        full = [result for result in self.history if result["fraction"] == 1.0]
+        return max(full, key=lambda result: result["total"])
+
+    def summary(self) -> Dict[str, Any]:
+        grid_calls = self.grid_size * self.full_ticks
+        return {
+            "method": self.method,
+            "best": self.best,
+            "evaluations": len(self.history),
+            "run_calls": self.run_calls,
+            "grid_run_calls": grid_calls,
+            "fraction_of_grid": self.run_calls / grid_calls,
+        }
+
+
+def rung_fractions(eta: int, rungs: int) -> List[float]:
+    """Share of every day replayed per rung, growing by eta up to 1."""
+    return [float(eta) ** (rung - rungs + 1) for rung in range(rungs - 1)] + [1.0]
+
+
+def top(points: List[Overrides], results: List[Dict[str, Any]], keep: int) -> List[Overrides]:
+    # Stable on ties, and survivors stay in grid order
+    ranked = sorted(range(len(results)), key=lambda idx: -results[idx]["total"])
+    return [points[idx] for idx in sorted(ranked[:keep])]
+
+
+def _halve(evaluate: Evaluate, search: SearchResult, survivors: List[Overrides], fractions: List[float],
+           eta: int) -> None:
+    for rung, fraction in enumerate(fractions):
+        results = evaluate(survivors, fraction)
+        search.add(results)
+        if rung < len(fractions) - 1:
+            survivors = top(survivors, results, max(math.ceil(len(survivors) / eta), 1))
+
+
+def successive_halving(evaluate: Evaluate, points: List[Overrides], full_ticks: int,
+                       eta: int = ETA, rungs: int = RUNGS) -> SearchResult:
+    """
+    Replay every point on the first 1/eta**(rungs-1) of each day, keep the best 1/eta and
+    replay those on eta times as much, until the last rung replays the survivors in full.
+    """
+    search = SearchResult("halving", len(points), full_ticks)
+    _halve(evaluate, search, list(points), rung_fractions(eta, rungs), eta)
+    return search
+
+
+def encode_points(grid: Grid, points: List[Overrides]) -> np.ndarray:
+    """Each grid axis mapped to [0, 1] by value index, so non-numeric values work too."""
+    columns = []
+    for name, values in grid.items():
+        scale = max(len(values) - 1, 1)
+        index = {json.dumps(value): idx for idx, value in enumerate(values)}
+        columns.append([index[json.dumps(point[name])] / scale for point in points])
+    return np.array(columns, dtype=np.float64).T.reshape(len(points), len(grid))
+
+
+def _rbf(a: np.ndarray, b: np.ndarray, length_scale: float) -> np.ndarray:
+    distances = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+    return np.exp(-0.5 * distances / length_scale ** 2)
+
+
+def expected_improvement(x_seen: np.ndarray, y_seen: np.ndarray, x_candidates: np.ndarray,
+                         length_scale: float = LENGTH_SCALE) -> np.ndarray:
+    """Gaussian process posterior (RBF kernel, standardised targets) and EI over the best seen."""
+    std = y_seen.std() or 1.0
+    y = (y_seen - y_seen.mean()) / std
+
+    k = _rbf(x_seen, x_seen, length_scale) + NOISE * np.eye(len(x_seen))
+    k_star = _rbf(x_candidates, x_seen, length_scale)
+    chol = np.linalg.cholesky(k)
+    alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, y))
+    v = np.linalg.solve(chol, k_star.T)
+
+    mean = k_star @ alpha
+    sigma = np.sqrt(np.maximum(1.0 - (v ** 2).sum(axis=0), 1e-12))
+
+    z = (mean - y.max()) / sigma
+    cdf = 0.5 * (1.0 + np.array([math.erf(value / math.sqrt(2.0)) for value in z]))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2.0 * math.pi)
+    return (mean - y.max()) * cdf + sigma * pdf
+
+
+def bayesian_search(evaluate: Evaluate, grid: Grid, points: List[Overrides], full_ticks: int,
+                    eta: int = ETA, rungs: int = RUNGS, initial: int = BAYES_INITIAL, batch: int = BAYES_BATCH,
+                    patience: int = BAYES_PATIENCE, max_evaluations: int = None, seed: int = 0) -> SearchResult:
+    """
+    Screen grid points on the first rung's slice of every day: a few random ones, then
+    repeatedly the `batch` points with the highest expected improvement. Screening stops after
+    `patience` batches without a better PnL, when no point is expected to improve, or after
+    max_evaluations; the best 1/eta screened points then go through the remaining halving rungs.
+    """
+    search = SearchResult("bayes", len(points), full_ticks)
+    encoded = encode_points(grid, points)
+    fractions = rung_fractions(eta, rungs)
+    max_evaluations = len(points) if max_evaluations is None else min(max_evaluations, len(points))
+
+    rng = np.random.default_rng(seed)
+    first = rng.choice(len(points), size=min(initial, max_evaluations), replace=False)
+    seen: List[int] = sorted(first.tolist())
+    screened = evaluate([points[idx] for idx in seen], fractions[0])
+
+    best = max(result["total"] for result in screened)
+    stale = 0
+    while len(seen) < max_evaluations and stale < patience:
+        unseen = np.setdiff1d(np.arange(len(points)), seen)
+        scores = np.array([result["total"] for result in screened], dtype=np.float64)
+        ei = expected_improvement(encoded[seen], scores, encoded[unseen])
+        if ei.max() <= 0:
+            break
+
+        size = min(batch, max_evaluations - len(seen))
+        chosen = sorted(unseen[np.argsort(-ei, kind="stable")[:size]].tolist())
+        results = evaluate([points[idx] for idx in chosen], fractions[0])
+        screened.extend(results)
+        seen.extend(chosen)
+
+        batch_best = max(result["total"] for result in results)
+        if batch_best > best:
+            best = batch_best
+            stale = 0
+        else:
+            stale += 1
+
+    search.add(screened)
+    if len(fractions) == 1:
+        return search
+
+    promoted = top([points[idx] for idx in seen], screened, max(math.ceil(len(seen) / eta), 1))
+    _halve(evaluate, search, promoted, fractions[1:], eta)
+    return search
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search a PARAMS grid without replaying all of it")
+    parser.add_argument("strategy", help="path to a file defining Trader(params) and PARAMS")
+    parser.add_argument("prices", nargs="+", help="semicolon separated price files")
+    parser.add_argument("--grid", required=True, help='JSON, e.g. {"RAINFOREST_RESIN.our_buy_price": [9998, 9999]}')
+    parser.add_argument("--method", choices=("halving", "bayes"), default="halving")
+    parser.add_argument("--eta", type=int, default=ETA, help="keep the best 1/eta per rung")
+    parser.add_argument("--rungs", type=int, default=RUNGS, help="number of rungs, the last replays full days")
+    parser.add_argument("--batch", type=int, default=BAYES_BATCH, help="bayes: points proposed per round")
+    parser.add_argument("--patience", type=int, default=BAYES_PATIENCE, help="bayes: rounds without improvement")
+    parser.add_argument("--max-evaluations", type=int, help="bayes: stop after this many replays")
+    parser.add_argument("--workers", type=int, help="defaults to the number of cores")
+    parser.add_argument("--output", help="write the summary and every replay to this JSON file")
+    args = parser.parse_args()
+
+    data = MarketData.from_files(args.prices)
+    grid = json.loads(args.grid)
+    points = param_grid(grid)
+
+    start = time.perf_counter()
+    with SweepPool(os.path.abspath(args.strategy), data, args.workers) as pool:
+        if args.method == "halving":
+            search = successive_halving(pool.evaluate, points, len(data), args.eta, args.rungs)
+        else:
+            search = bayesian_search(pool.evaluate, grid, points, len(data), args.eta, args.rungs, batch=args.batch,
+                                     patience=args.patience, max_evaluations=args.max_evaluations)
+    elapsed = time.perf_counter() - start
+
+    summary = search.summary()
+    params = " ".join(f"{key}={value}" for key, value in summary["best"]["params"].items())
+    print(f"best {summary['best']['total']:.1f}  {params}")
+    print(f"{summary['evaluations']} replays, {summary['run_calls']} run() calls, "
+          f"{summary['fraction_of_grid']:.1%} of the full grid, {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "history": search.history}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
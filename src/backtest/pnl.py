@@ -0,0 +1,97 @@
+import math
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from src.model.datamodel import Product
+
+# Mark-to-market PnL per product: cash spent on fills plus the position valued at the last mid
+# price, restarting at every session (day of a round) as each is a separate exchange run. PnLLedger updates in
+# O(1) per fill and per mark for tick-by-tick replays, batch_pnl computes the same series for a
+# whole replay at once. src.backtest.reconcile compares them with the exchange's profit_and_loss
+# for products the exchange marks at mid_price.
+
+
+class ProductPnL:
+    __slots__ = ("position", "cash", "mid_price")
+
+    def __init__(self) -> None:
+        self.position = 0
+        self.cash = 0.0
+        self.mid_price = 0.0
+
+    def fill(self, price: int, quantity: int) -> None:
+        """quantity is positive for a buy, negative for a sell."""
+        self.position += quantity
+        self.cash -= price * quantity
+
+    def mark(self, mid_price: float) -> None:
+        # Exchange files write mid_price 0 when one side of the book is empty; the last mid is kept
+        if mid_price and not math.isnan(mid_price):
+            self.mid_price = mid_price
+
+    @property
+    def value(self) -> float:
+        return self.cash + self.position * self.mid_price
+
+
+class PnLLedger:
+    """Running ProductPnL of every product traded or marked so far."""
+
+    def __init__(self) -> None:
+        self.accounts: Dict[Product, ProductPnL] = {}
+
+    def account(self, product: Product) -> ProductPnL:
+        account = self.accounts.get(product)
+        if account is None:
+            account = self.accounts[product] = ProductPnL()
+        return account
+
+    def fill(self, product: Product, price: int, quantity: int) -> None:
+        self.account(product).fill(price, quantity)
+
+    def mark(self, product: Product, mid_price: float) -> None:
+        self.account(product).mark(mid_price)
+
+    def positions(self) -> Dict[Product, int]:
+        """Non-zero positions, as TradingState.position holds them."""
+        return {product: account.position for product, account in self.accounts.items() if account.position}
+
+    def pnl(self) -> Dict[Product, float]:
+        return {product: self.accounts[product].value for product in sorted(self.accounts)}
+
+    def total(self) -> float:
+        return sum(account.value for account in self.accounts.values())
+
+
+def daily_cumsum(values: np.ndarray, sessions: np.ndarray) -> np.ndarray:
+    """Cumulative sum that restarts wherever the session changes."""
+    total = np.cumsum(values)
+    starts = np.flatnonzero(np.insert(sessions[1:] != sessions[:-1], 0, True))
+    offsets = np.concatenate(([0.0], total[starts[1:] - 1]))
+    return total - np.repeat(offsets, np.diff(np.append(starts, len(values))))
+
+
+def batch_pnl(products: Sequence[Product], sessions: np.ndarray, mid_prices: Dict[Product, np.ndarray],
+              fill_ticks: np.ndarray, fill_products: np.ndarray, fill_prices: np.ndarray,
+              fill_quantities: np.ndarray) -> Tuple[Dict[Product, np.ndarray], Dict[Product, np.ndarray], Dict[Product, np.ndarray]]:
+    """
+    (positions, cash, pnl) per product at every tick, from fills given as arrays with
+    fill_products indexing products. mid_prices must already carry the last mid over gaps.
+    """
+    n = len(sessions)
+    positions: Dict[Product, np.ndarray] = {}
+    cash: Dict[Product, np.ndarray] = {}
+    pnl: Dict[Product, np.ndarray] = {}
+
+    for idx, product in enumerate(products):
+        mask = fill_products == idx
+        ticks = fill_ticks[mask]
+        quantities = fill_quantities[mask]
+        notional = (fill_prices[mask] * quantities).astype(np.float64)
+
+        positions[product] = daily_cumsum(np.bincount(ticks, weights=quantities, minlength=n), sessions).astype(np.int64)
+        cash[product] = -daily_cumsum(np.bincount(ticks, weights=notional, minlength=n), sessions)
+        pnl[product] = cash[product] + positions[product] * mid_prices[product]
+
+    return positions, cash, pnl
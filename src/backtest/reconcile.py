@@ -0,0 +1,184 @@
+import argparse
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.backtest.engine import (
+    BacktestResult, Fills, MarketData, load_tables, load_trader, run_backtest, table_keys, tick_keys,
+)
+from src.backtest.matching import SUBMISSION
+from src.backtest.pnl import batch_pnl
+from src.data.prices import PriceTable
+from src.data.trades import TradeIndex
+from src.model.datamodel import Product
+
+# Checks our PnL accounting against the profit_and_loss column the exchange writes into the price
+# files of a submission. With the submission's own trades (buyer or seller SUBMISSION) the fills
+# are the exchange's, so any difference is in the accounting; with a backtest it is in the fills.
+#
+# Two differences from PnLLedger/batch_pnl are known. The exchange's column shows a fill from
+# the row after the one it happened on, so fills are booked fill_lag ticks late here. And it
+# does not mark every product at mid_price: with integer prices and positions a mid-marked PnL
+# is a multiple of 0.5, and the KELP column is not (e.g. 1.157470703125), so such products are
+# reported as not comparable rather than compared. Only the data/ files have been checked, and
+# their profit_and_loss belongs to a submission whose trades are not in this repo.
+
+DEFAULT_TOLERANCE = 1e-6
+
+# Ticks between a fill and the first row whose profit_and_loss includes it
+DEFAULT_FILL_LAG = 1
+
+# Grid of mid-marked PnL: integer cash plus an integer position times a mid on half ticks
+MID_MARK_STEP = 0.5
+
+
+class Reconciliation:
+    """Our PnL series against the profit_and_loss column of one product's rows."""
+
+    def __init__(self, product: Product, rounds: np.ndarray, days: np.ndarray, timestamps: np.ndarray,
+                 ours: np.ndarray, theirs: np.ndarray, tolerance: float) -> None:
+        self.product = product
+        self.rounds = rounds
+        self.days = days
+        self.timestamps = timestamps
+        self.ours = ours
+        self.theirs = theirs
+        self.errors = ours - theirs
+        self.tolerance = tolerance
+        steps = theirs / MID_MARK_STEP
+        # False when the exchange marks this product at something other than mid_price
+        self.comparable = bool(np.all(np.abs(steps - np.round(steps)) <= tolerance))
+
+    @property
+    def max_error(self) -> float:
+        return float(np.abs(self.errors).max()) if len(self.errors) else 0.0
+
+    @property
+    def matches(self) -> bool:
+        return self.max_error <= self.tolerance
+
+    def first_mismatch(self) -> Tuple[int, int, int]:
+        """(round, day, timestamp) of the first row off by more than the tolerance, or None."""
+        rows = np.flatnonzero(np.abs(self.errors) > self.tolerance)
+        if not len(rows):
+            return None
+        return int(self.rounds[rows[0]]), int(self.days[rows[0]]), int(self.timestamps[rows[0]])
+
+    def day_ends(self) -> List[Tuple[int, int, float, float]]:
+        """(round, day, ours, theirs) at the last row of every day of every round."""
+        changes = (self.rounds[1:] != self.rounds[:-1]) | (self.days[1:] != self.days[:-1])
+        ends = np.flatnonzero(np.append(changes, True))
+        return [
+            (int(self.rounds[end]), int(self.days[end]), float(self.ours[end]), float(self.theirs[end]))
+            for end in ends
+        ]
+
+
+def _ticks(data: MarketData, keys: np.ndarray) -> np.ndarray:
+    ticks = np.minimum(np.searchsorted(data.keys, keys), len(data.keys) - 1)
+    if np.any(data.keys[ticks] != keys):
+        raise ValueError("rows outside the ticks of the price files")
+    return ticks
+
+
+def submission_fills(data: MarketData, trades: TradeIndex) -> Fills:
+    """The submission's own trades in trades, as fills on the ticks of data."""
+    product_index = {product: idx for idx, product in enumerate(data.products)}
+    rounds, days, timestamps, own = [], [], [], []
+    for (round_, day, timestamp), by_symbol in sorted(trades.ticks.items()):
+        for symbol, symbol_trades in by_symbol.items():
+            for trade in symbol_trades:
+                if trade.buyer == SUBMISSION:
+                    quantity = trade.quantity
+                elif trade.seller == SUBMISSION:
+                    quantity = -trade.quantity
+                else:
+                    continue
+                if symbol not in product_index:
+                    raise ValueError(f"{symbol} has no prices")
+                rounds.append(round_)
+                days.append(day)
+                timestamps.append(timestamp)
+                own.append((product_index[symbol], trade.price, quantity))
+
+    fills = Fills()
+    if own:
+        ticks = _ticks(data, tick_keys(np.array(rounds), np.array(days), np.array(timestamps))).tolist()
+        for tick, (product_idx, price, quantity) in zip(ticks, own):
+            fills.add(tick, product_idx, price, quantity)
+    return fills
+
+
+def lagged_pnl(data: MarketData, result: BacktestResult, fill_lag: int) -> Dict[Product, np.ndarray]:
+    """
+    result's PnL with every fill booked fill_lag ticks later, as the exchange's column shows it.
+    Fills lagged past the end of their session never show and are dropped.
+    """
+    if fill_lag < 0:
+        raise ValueError(f"fill_lag must be non-negative, got {fill_lag}")
+    if fill_lag == 0:
+        return result.pnl
+
+    ticks = result.fill_ticks + fill_lag
+    keep = ticks < len(data.sessions)
+    keep[keep] = data.sessions[ticks[keep]] == data.sessions[result.fill_ticks[keep]]
+    _, _, pnl = batch_pnl(
+        result.products, result.sessions, data.mid_prices,
+        ticks[keep], result.fill_products[keep], result.fill_prices[keep], result.fill_quantities[keep],
+    )
+    return pnl
+
+
+def reconcile(data: MarketData, result: BacktestResult, tables: Dict[Product, PriceTable],
+              tolerance: float = DEFAULT_TOLERANCE, fill_lag: int = DEFAULT_FILL_LAG) -> Dict[Product, Reconciliation]:
+    """Compare result's PnL with the profit_and_loss column of tables on the rows each table has."""
+    pnl = lagged_pnl(data, result, fill_lag)
+    reconciliations = {}
+    for product, table in sorted(tables.items()):
+        rounds = np.asarray(table["round"] if "round" in table else np.zeros(len(table)), dtype=np.int64)
+        days = np.asarray(table["day"], dtype=np.int64)
+        timestamps = np.asarray(table["timestamp"], dtype=np.int64)
+        ours = pnl[product][_ticks(data, table_keys(table))]
+        theirs = np.asarray(table["profit_and_loss"], dtype=np.float64)
+        reconciliations[product] = Reconciliation(product, rounds, days, timestamps, ours, theirs, tolerance)
+    return reconciliations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile PnL with the profit_and_loss column of price files")
+    parser.add_argument("prices", nargs="+", help="price files the exchange wrote for one submission")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trades", nargs="+", help="trades_round_N_day_D.csv files holding the submission's trades")
+    source.add_argument("--strategy", help="backtest this Trader instead and compare its PnL")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--fill-lag", type=int, default=DEFAULT_FILL_LAG,
+                        help="ticks between a fill and the first row whose profit_and_loss includes it")
+    args = parser.parse_args()
+
+    tables = load_tables(args.prices)
+    data = MarketData(tables)
+    if args.trades:
+        result = BacktestResult(data, submission_fills(data, TradeIndex.from_files(args.trades)))
+    else:
+        result = run_backtest(load_trader(args.strategy), data)
+
+    reconciliations = reconcile(data, result, tables, args.tolerance, args.fill_lag)
+    for product, reconciliation in reconciliations.items():
+        if not reconciliation.comparable:
+            status = "not compared, the exchange does not mark it at mid_price"
+        elif reconciliation.matches:
+            status = "ok"
+        else:
+            status = f"first mismatch at {reconciliation.first_mismatch()}"
+        print(f"{product}: max error {reconciliation.max_error:.6f}, {status}")
+        for round_, day, ours, theirs in reconciliation.day_ends():
+            print(f"  round {round_} day {day}: ours {ours:.2f}, exchange {theirs:.2f}")
+
+    if not any(reconciliation.comparable for reconciliation in reconciliations.values()):
+        raise SystemExit("no product is marked at mid_price, nothing was compared")
+    if not all(reconciliation.matches for reconciliation in reconciliations.values() if reconciliation.comparable):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
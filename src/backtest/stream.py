@@ -0,0 +1,101 @@
+import argparse
+from typing import Any, Dict, List
+
+from src.backtest.engine import DEFAULT_LIMITS, load_trader, replay_output
+from src.backtest.matching import SUBMISSION, match_orders
+from src.backtest.pnl import PnLLedger
+from src.data.stream import DEFAULT_CHUNK_SIZE, Session, stream_states
+from src.data.trades import TradeIndex, day_of, round_of
+from src.model.compact import Trade
+from src.model.datamodel import Product, Symbol
+from src.model.logger import DISABLED
+
+# Replays straight from price files through src.data.stream, keeping only the current tick
+# and running totals, so memory does not grow with the number of days replayed.
+
+
+def replay_stream(trader: Any, paths: List[str], limits: Dict[Product, int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  quiet: bool = True, log_mode: str = DISABLED,
+                  trade_paths: List[str] = ()) -> Dict[Session, Dict[Product, float]]:
+    """
+    Replay every session of the price files in order, returning each session's final PnL per product.
+    trade_paths are trades_round_N_day_D.csv files, loaded one session at a time for market_trades.
+    """
+    limits = DEFAULT_LIMITS if limits is None else limits
+    results: Dict[Session, Dict[Product, float]] = {}
+
+    trade_files: Dict[Session, List[str]] = {}
+    for path in trade_paths:
+        if day_of(path) is None:
+            raise ValueError(f"cannot tell the round and day of {path}")
+        trade_files.setdefault((round_of(path), day_of(path)), []).append(path)
+
+    session = None
+    market_trades = TradeIndex()
+    previous_timestamp = None
+    book = PnLLedger()
+    own_trades: Dict[Symbol, List[Trade]] = {}
+    trader_data = ""
+
+    with replay_output(quiet, log_mode):
+        for tick, state in stream_states(paths, chunk_size):
+            if tick.session != session:
+                if session is not None:
+                    results[session] = book.pnl()
+                # Each session is a separate exchange run
+                session = tick.session
+                book = PnLLedger()
+                own_trades = {}
+                trader_data = ""
+                market_trades = TradeIndex.from_files(trade_files.get(session, []))
+                previous_timestamp = None
+
+            state.traderData = trader_data
+            state.own_trades = own_trades
+            state.position = book.positions()
+            # Trades printed since the previous tick
+            if previous_timestamp is not None:
+                state.market_trades = market_trades.at(session[1], previous_timestamp, session[0])
+            previous_timestamp = tick.timestamp
+
+            orders, _, trader_data = trader.run(state)
+
+            # Strategies may mutate the depths they were given, so match against fresh ones
+            books_now = {product: row.order_depth() for product, row in tick.rows.items()}
+            matched = match_orders(orders, books_now, book.positions(), limits, tick.timestamp)
+            for product, trades in matched.own_trades.items():
+                for trade in trades:
+                    book.fill(product, trade.price, trade.quantity if trade.buyer == SUBMISSION else -trade.quantity)
+            own_trades = matched.own_trades
+
+            for product, row in tick.rows.items():
+                book.mark(product, row.mid_price)
+
+    if session is not None:
+        results[session] = book.pnl()
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay price files through a Trader without loading them whole")
+    parser.add_argument("strategy", help="path to a file defining Trader")
+    parser.add_argument("prices", nargs="+", help="semicolon separated price files, any number of rounds and days")
+    parser.add_argument("--trades", nargs="+", default=[], help="trades_round_N_day_D.csv files for market_trades")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lines read ahead per file")
+    args = parser.parse_args()
+
+    results = replay_stream(load_trader(args.strategy), args.prices, chunk_size=args.chunk_size, trade_paths=args.trades)
+
+    totals: Dict[Product, float] = {}
+    for (round_, day), pnl in results.items():
+        print(f"round {round_} day {day}: " + ", ".join(f"{product} {value:.1f}" for product, value in pnl.items()))
+        for product, value in pnl.items():
+            totals[product] = totals.get(product, 0.0) + value
+    for product, value in totals.items():
+        print(f"{product}: {value:.1f}")
+    print(f"TOTAL: {sum(totals.values()):.1f}")
+
+
+if __name__ == "__main__":
+    main()
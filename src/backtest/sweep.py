@@ -0,0 +1,197 @@
+import argparse
+import copy
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.backtest.engine import MarketData, load_module, run_backtest
+
+# Grid keys are "<product>.<param>", e.g. {"RAINFOREST_RESIN.our_buy_price": [9997, 9998, 9999]}
+Grid = Dict[str, List[Any]]
+Overrides = Dict[str, Any]
+
+# (array name, dtype, shape, byte offset) of every array in the shared block
+Layout = List[Tuple[str, str, Tuple[int, ...], int]]
+
+# Keeps every array in the block 64 byte aligned
+ALIGNMENT = 64
+
+
+class SharedMarketData:
+    """
+    MarketData copied once into a single shared memory block. Workers map the block and
+    rebuild MarketData around views of it, so nothing is parsed or copied per worker.
+    """
+
+    def __init__(self, data: MarketData) -> None:
+        arrays = data.arrays()
+
+        self.layout: Layout = []
+        size = 0
+        for name, values in arrays.items():
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            self.layout.append((name, values.dtype.str, values.shape, size))
+            size += values.nbytes
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, dtype, shape, offset in self.layout:
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = arrays[name]
+
+    @property
+    def spec(self) -> Tuple[str, Layout]:
+        """What a worker needs to attach, small enough to pickle per worker."""
+        return self.shm.name, self.layout
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def attach(spec: Tuple[str, Layout]) -> Tuple[shared_memory.SharedMemory, MarketData]:
+    name, layout = spec
+    # Pool workers share the parent's resource tracker, which already owns the block
+    shm = shared_memory.SharedMemory(name=name)
+
+    arrays = {}
+    for array_name, dtype, shape, offset in layout:
+        values = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        values.flags.writeable = False
+        arrays[array_name] = values
+    return shm, MarketData.from_arrays(arrays)
+
+
+def param_grid(grid: Grid) -> List[Overrides]:
+    """Every combination of the grid values, in the order the grid lists them."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def apply_overrides(params: Dict[str, Dict[str, Any]], overrides: Overrides) -> Dict[str, Dict[str, Any]]:
+    params = copy.deepcopy(params)
+    for key, value in overrides.items():
+        product, _, name = key.partition(".")
+        if product not in params or name not in params[product]:
+            raise ValueError(f"unknown parameter {key}")
+        params[product][name] = value
+    return params
+
+
+# Per-worker state, set up once by _init_worker
+_shm: Optional[shared_memory.SharedMemory] = None
+_data: Optional[MarketData] = None
+_modules: Dict[str, Any] = {}
+_prefixes: Dict[float, MarketData] = {}
+
+
+def _init_worker(spec: Tuple[str, Layout]) -> None:
+    global _shm, _data
+    _shm, _data = attach(spec)
+
+
+def evaluate(strategy: str, overrides: Overrides, fraction: float = 1.0, data: Optional[MarketData] = None) -> Dict[str, Any]:
+    """Replay one parameter set over the first `fraction` of every day, in a worker unless data is given."""
+    data = _data if data is None else data
+    if fraction < 1.0:
+        prefix = _prefixes.get(fraction) if data is _data else None
+        if prefix is None:
+            prefix = data.day_prefix(fraction)
+            if data is _data:
+                _prefixes[fraction] = prefix
+        data = prefix
+
+    module = _modules.get(strategy)
+    if module is None:
+        module = _modules[strategy] = load_module(strategy)
+
+    trader = module.Trader(apply_overrides(module.PARAMS, overrides))
+    start = time.perf_counter()
+    pnl = run_backtest(trader, data).final_pnl()
+    return {
+        "params": overrides,
+        "fraction": fraction,
+        "ticks": len(data),
+        "pnl": pnl,
+        "total": sum(pnl.values()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class SweepPool:
+    """Process pool whose workers replay one strategy over a shared copy of data."""
+
+    def __init__(self, strategy: str, data: MarketData, workers: int = None) -> None:
+        self.strategy = strategy
+        self.params = load_module(strategy).PARAMS
+        self.shared = SharedMarketData(data)
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, initializer=_init_worker, initargs=(self.shared.spec,)
+        )
+
+    def evaluate(self, points: List[Overrides], fraction: float = 1.0) -> List[Dict[str, Any]]:
+        """Results in the order of points."""
+        # Fail on unknown names before anything is sent to a worker
+        for overrides in points:
+            apply_overrides(self.params, overrides)
+        return list(self.pool.map(evaluate, itertools.repeat(self.strategy), points, itertools.repeat(fraction)))
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.shared.close()
+
+    def __enter__(self) -> "SweepPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def run_sweep(strategy: str, data: MarketData, grid: Grid, workers: int = None) -> List[Dict[str, Any]]:
+    """Evaluate every point of grid over a process pool, results in grid order."""
+    points = param_grid(grid)
+    if not points:
+        return []
+
+    with SweepPool(strategy, data, min(workers or os.cpu_count() or 1, len(points))) as pool:
+        return pool.evaluate(points)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a grid of PARAMS values over a process pool")
+    parser.add_argument("strategy", help="path to a file defining Trader(params) and PARAMS")
+    parser.add_argument("prices", nargs="+", help="semicolon separated price files")
+    parser.add_argument("--grid", required=True, help='JSON, e.g. {"RAINFOREST_RESIN.our_buy_price": [9998, 9999]}')
+    parser.add_argument("--workers", type=int, help="defaults to the number of cores")
+    parser.add_argument("--output", help="write every result to this JSON file")
+    args = parser.parse_args()
+
+    data = MarketData.from_files(args.prices)
+    grid = json.loads(args.grid)
+
+    start = time.perf_counter()
+    results = run_sweep(os.path.abspath(args.strategy), data, grid, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for result in sorted(results, key=lambda result: -result["total"]):
+        params = " ".join(f"{key}={value}" for key, value in result["params"].items())
+        print(f"{result['total']:>10.1f}  {params}")
+    print(f"{len(results)} runs in {elapsed:.1f}s, {len(results) / elapsed:.2f} runs/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import ast
+import os
+from typing import Dict, List, Set
+
+# The exchange takes a single Python file next to its own datamodel.py, so strategies importing
+# src modules cannot be uploaded as they are. bundle() writes one file holding the strategy and
+# the source of every src module it needs, directly or through other src modules:
+#
+#     python -m src.bundle refined_model.py src/strategies/kelp.py    # -> dist/refined_model.py, dist/kelp.py
+#
+# The modules are served by an import hook appended to sys.meta_path, so the strategy's own
+# `from src... import` lines resolve to the bundled copies only where no src package is
+# importable; run from this repo, a bundle uses the live modules. src.model.datamodel resolves to
+# the exchange's datamodel.
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "src"
+DEFAULT_OUT_DIR = os.path.join(ROOT_DIR, "dist")
+
+# src modules the exchange provides under another name
+ALIASES = {"src.model.datamodel": "datamodel"}
+
+LOADER = '''\
+import importlib as _bundle_importlib
+import importlib.util as _bundle_importlib_util
+import sys as _bundle_sys
+
+
+class _BundleFinder:
+    """Serves _BUNDLED_MODULES when no src package is importable."""
+
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        if name in _BUNDLED_PACKAGES:
+            return _bundle_importlib_util.spec_from_loader(name, cls, is_package=True)
+        if name in _BUNDLED_MODULES or name in _BUNDLED_ALIASES:
+            return _bundle_importlib_util.spec_from_loader(name, cls)
+        return None
+
+    @staticmethod
+    def create_module(spec):
+        return None
+
+    @staticmethod
+    def exec_module(module):
+        name = module.__name__
+        if name in _BUNDLED_ALIASES:
+            module.__dict__.update(vars(_bundle_importlib.import_module(_BUNDLED_ALIASES[name])))
+        elif name in _BUNDLED_MODULES:
+            filename = "<bundled " + name.replace(".", "/") + ".py>"
+            exec(compile(_BUNDLED_MODULES[name], filename, "exec"), module.__dict__)
+
+
+_bundle_sys.meta_path.append(_BundleFinder)
+'''
+
+
+def module_path(name: str) -> str:
+    return os.path.join(ROOT_DIR, *name.split(".")) + ".py"
+
+
+def is_module(name: str) -> bool:
+    return os.path.isfile(module_path(name))
+
+
+def src_imports(source: str) -> Set[str]:
+    """src modules imported anywhere in source; `from src.x import y` counts y when it is a module."""
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names if alias.name.split(".")[0] == PACKAGE)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module and node.module.split(".")[0] == PACKAGE:
+            for alias in node.names:
+                submodule = f"{node.module}.{alias.name}"
+                names.add(submodule if is_module(submodule) else node.module)
+    return names
+
+
+def read_source(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def dependencies(source: str) -> Dict[str, str]:
+    """{module name: source} of every src module source needs, directly or transitively."""
+    modules: Dict[str, str] = {}
+    pending = sorted(src_imports(source))
+    while pending:
+        name = pending.pop()
+        if name in modules or name in ALIASES:
+            continue
+        if not is_module(name):
+            # Package imports (`import src.model`) need no source, only the package itself
+            if os.path.isdir(os.path.join(ROOT_DIR, *name.split("."))):
+                continue
+            raise ValueError(f"{name} is not a module under {ROOT_DIR}")
+        modules[name] = read_source(module_path(name))
+        pending.extend(sorted(src_imports(modules[name]) - set(modules)))
+    return dict(sorted(modules.items()))
+
+
+def packages(names: List[str]) -> List[str]:
+    """Every package containing one of names."""
+    found = set()
+    for name in names:
+        parts = name.split(".")
+        found.update(".".join(parts[:end]) for end in range(1, len(parts)))
+    return sorted(found)
+
+
+def bundle(path: str) -> str:
+    """The strategy at path with every src module it needs, as one uploadable file."""
+    source = read_source(path)
+    if any(isinstance(node, ast.ImportFrom) and node.module == "__future__" for node in ast.parse(source).body):
+        raise ValueError(f"{path}: __future__ imports must come first and cannot be bundled")
+
+    modules = dependencies(source)
+    lines = [
+        f"# Bundled by src.bundle from {os.path.relpath(path, ROOT_DIR)}; edit the source, not this file.",
+        "",
+        "_BUNDLED_MODULES = {",
+    ]
+    lines.extend(f"    {name!r}: {module_source!r}," for name, module_source in modules.items())
+    lines.append("}")
+    lines.append(f"_BUNDLED_PACKAGES = {tuple(packages(list(modules) + list(ALIASES)))!r}")
+    lines.append(f"_BUNDLED_ALIASES = {ALIASES!r}")
+    lines.append("")
+    lines.append(LOADER)
+    lines.append(f"# --- {os.path.relpath(path, ROOT_DIR)} ---")
+    lines.append("")
+    return "\n".join(lines) + source
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bundle strategies and their src modules into uploadable files")
+    parser.add_argument("strategies", nargs="+", help="strategy files defining Trader")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR, help="directory the bundles are written to")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for path in args.strategies:
+        out_path = os.path.join(args.out_dir, os.path.basename(path))
+        if os.path.abspath(out_path) == os.path.abspath(path):
+            raise ValueError(f"{path}: bundle would overwrite its source")
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(bundle(path))
+        print(f"{path} -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
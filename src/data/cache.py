@@ -0,0 +1,57 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Parsed columns of a data file are cached as .npy files in <file>.npcache/ and memory-mapped on
+# later loads. meta.json names the arrays and records the cache kind and version and the size
+# and mtime of the source; it is written last, so a half-written cache is never considered valid.
+
+CACHE_SUFFIX = ".npcache"
+META_FILE = "meta.json"
+
+
+def cache_dir(path: str) -> str:
+    return path + CACHE_SUFFIX
+
+
+def source_key(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_arrays(path: str, kind: str, version: int, arrays: Dict[str, np.ndarray], extra: Dict[str, Any]) -> None:
+    """Cache arrays for path; extra is stored in meta.json and handed back by read_arrays."""
+    directory = cache_dir(path)
+    os.makedirs(directory, exist_ok=True)
+
+    files = {}
+    for name, values in arrays.items():
+        filename = f"{kind}__{name}.npy"
+        np.save(os.path.join(directory, filename), values)
+        files[name] = filename
+
+    meta = {"kind": kind, "version": version, "source": source_key(path), "files": files, "extra": extra}
+    tmp_path = os.path.join(directory, META_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, META_FILE))
+
+
+def read_arrays(path: str, kind: str, version: int) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """(memory-mapped arrays, extra) cached for path, or None if the cache is missing or stale."""
+    directory = cache_dir(path)
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("kind") != kind or meta.get("version") != version or meta.get("source") != source_key(path):
+        return None
+
+    arrays = {
+        name: np.load(os.path.join(directory, filename), mmap_mode="r")
+        for name, filename in meta["files"].items()
+    }
+    return arrays, meta["extra"]
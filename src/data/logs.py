@@ -0,0 +1,199 @@
+import json
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.data.cache import read_arrays, write_arrays
+from src.data.prices import BOOK_DEPTH
+from src.model.datamodel import Product
+from src.model.logger import DepthDecoder
+
+# Submission logs are the lines Logger.flush prints:
+#   [[timestamp, traderData, listings, order_depths, own_trades, market_trades, position, observations],
+#    orders, conversions, traderData, logs]
+# either one per line or as the "lambdaLog" strings of the exchange's sandbox log entries.
+# They are parsed one line at a time into typed growable buffers, so memory is the size of
+# the columns rather than of the decoded JSON.
+
+LOG_CACHE_KIND = "log"
+LOG_CACHE_VERSION = 2
+LAMBDA_LOG_KEY = '"lambdaLog":'
+
+# Long format tables, one row per (tick, product) or per order
+BOOK_COLUMNS = tuple(
+    f"{side}_{kind}_{level}" for side in ("bid", "ask") for kind in ("price", "volume") for level in range(1, BOOK_DEPTH + 1)
+)
+TEXT_COLUMNS = ("trader_data", "logs")
+
+
+def iter_flush_lines(path: str) -> Iterator[str]:
+    """Logger.flush output found in path, whichever of the two layouts it uses."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("[["):
+                yield stripped
+            elif stripped.startswith(LAMBDA_LOG_KEY):
+                value = json.loads(stripped[len(LAMBDA_LOG_KEY):].strip().rstrip(","))
+                if value.startswith("[["):
+                    yield value
+
+
+class _Text:
+    """Strings stored as one utf-8 buffer plus end offsets."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.ends = array("q")
+
+    def append(self, value: str) -> None:
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+
+class SubmissionLog:
+    """Columns parsed from a submission log. Per-product views are rebuilt on the tick grid."""
+
+    def __init__(self, products: List[Product], columns: Dict[str, np.ndarray]) -> None:
+        self.products = products
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.columns["timestamp"]
+
+    def _rows(self, prefix: str, product: Product) -> np.ndarray:
+        return np.flatnonzero(self.columns[f"{prefix}_product"] == self.products.index(product))
+
+    def book(self, product: Product) -> Dict[str, np.ndarray]:
+        """(ticks, BOOK_DEPTH) bid/ask prices and volumes, zero where the product had no level."""
+        rows = self._rows("book", product)
+        ticks = self.columns["book_tick"][rows]
+        book = {}
+        for side in ("bid", "ask"):
+            for kind in ("price", "volume"):
+                values = np.zeros((len(self), BOOK_DEPTH), dtype=np.int64)
+                for level in range(BOOK_DEPTH):
+                    values[ticks, level] = self.columns[f"{side}_{kind}_{level + 1}"][rows]
+                book[f"{side}_{kind}s"] = values
+        return book
+
+    def positions(self, product: Product) -> np.ndarray:
+        """Position at the start of every tick, 0 where the state had none."""
+        rows = self._rows("position", product)
+        positions = np.zeros(len(self), dtype=np.int64)
+        positions[self.columns["position_tick"][rows]] = self.columns["position"][rows]
+        return positions
+
+    def orders(self, product: Product) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(tick, price, quantity) of every order sent for product."""
+        rows = self._rows("order", product)
+        return self.columns["order_tick"][rows], self.columns["order_price"][rows], self.columns["order_quantity"][rows]
+
+    def text(self, column: str, tick: int) -> str:
+        ends = self.columns[f"{column}_ends"]
+        start = ends[tick - 1] if tick else 0
+        return bytes(self.columns[f"{column}_data"][start:ends[tick]]).decode("utf-8")
+
+    def logs(self, tick: int) -> str:
+        return self.text("logs", tick)
+
+    def trader_data(self, tick: int) -> str:
+        return self.text("trader_data", tick)
+
+
+def parse_log(path: str) -> SubmissionLog:
+    products: List[Product] = []
+    product_index: Dict[Product, int] = {}
+
+    def code(product: Product) -> int:
+        idx = product_index.get(product)
+        if idx is None:
+            idx = product_index[product] = len(products)
+            products.append(product)
+        return idx
+
+    ints = {
+        name: array("q")
+        for name in (
+            "timestamp", "conversions",
+            "book_tick", "book_product", *BOOK_COLUMNS,
+            "position_tick", "position_product", "position",
+            "order_tick", "order_product", "order_price", "order_quantity",
+        )
+    }
+    texts = {column: _Text() for column in TEXT_COLUMNS}
+    empty_levels = [(0, 0)] * BOOK_DEPTH
+    # Books written with a delta depth encoding are rebuilt here; until the first keyframe they are unknown
+    depths = DepthDecoder()
+
+    for tick, line in enumerate(iter_flush_lines(path)):
+        state, orders, conversions, trader_data, logs = json.loads(line)
+        order_depths = depths.decode(state[3]) or {}
+        ints["timestamp"].append(state[0])
+        ints["conversions"].append(conversions)
+        texts["trader_data"].append(trader_data)
+        texts["logs"].append(logs)
+
+        for product, (buy_orders, sell_orders) in order_depths.items():
+            bids = sorted(((int(price), volume) for price, volume in buy_orders.items()), reverse=True)
+            asks = sorted((int(price), -volume) for price, volume in sell_orders.items())
+            ints["book_tick"].append(tick)
+            ints["book_product"].append(code(product))
+            for side, levels in (("bid", bids), ("ask", asks)):
+                levels = (levels + empty_levels)[:BOOK_DEPTH]
+                for level, (price, volume) in enumerate(levels, 1):
+                    ints[f"{side}_price_{level}"].append(price)
+                    ints[f"{side}_volume_{level}"].append(volume)
+
+        for product, position in state[6].items():
+            ints["position_tick"].append(tick)
+            ints["position_product"].append(code(product))
+            ints["position"].append(position)
+
+        for product, price, quantity in orders:
+            ints["order_tick"].append(tick)
+            ints["order_product"].append(code(product))
+            ints["order_price"].append(int(price))
+            ints["order_quantity"].append(quantity)
+
+    columns = {name: np.frombuffer(values, dtype=np.int64).copy() for name, values in ints.items()}
+    for column, text in texts.items():
+        columns[f"{column}_data"] = np.frombuffer(bytes(text.data), dtype=np.uint8)
+        columns[f"{column}_ends"] = np.frombuffer(text.ends, dtype=np.int64).copy()
+
+    return SubmissionLog(products, columns)
+
+
+def write_log_cache(path: str, log: SubmissionLog) -> None:
+    write_arrays(path, LOG_CACHE_KIND, LOG_CACHE_VERSION, log.columns, {"products": log.products})
+
+
+def read_log_cache(path: str) -> Optional[SubmissionLog]:
+    """Memory-mapped columns for path, or None if the cache is missing or stale."""
+    cached = read_arrays(path, LOG_CACHE_KIND, LOG_CACHE_VERSION)
+    if cached is None:
+        return None
+
+    columns, extra = cached
+    return SubmissionLog(extra["products"], columns)
+
+
+def load_log(path: str, use_cache: bool = True) -> SubmissionLog:
+    """Load a submission log, parsing it only if no valid cache exists next to it."""
+    if not use_cache:
+        return parse_log(path)
+
+    log = read_log_cache(path)
+    if log is not None:
+        return log
+
+    write_log_cache(path, parse_log(path))
+    return read_log_cache(path)
@@ -0,0 +1,136 @@
+import glob
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from src.data.cache import read_arrays, write_arrays
+from src.model.datamodel import Product
+
+CACHE_KIND = "prices"
+CACHE_VERSION = 2
+
+BOOK_DEPTH = 3
+INT_COLUMNS = ("day", "timestamp")
+FLOAT_COLUMNS = ("mid_price", "profit_and_loss")
+
+
+def _column_dtype(column: str) -> np.dtype:
+    if column in INT_COLUMNS or column.startswith(("bid_", "ask_")):
+        # Missing book levels are stored as price 0 / volume 0
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+class PriceTable:
+    """Typed per-column arrays of one product's rows from a price file."""
+
+    def __init__(self, product: Product, columns: Dict[str, np.ndarray]) -> None:
+        self.product = product
+        self.columns = columns
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def bid_prices(self) -> np.ndarray:
+        return np.column_stack([self.columns[f"bid_price_{i}"] for i in range(1, BOOK_DEPTH + 1)])
+
+    def bid_volumes(self) -> np.ndarray:
+        return np.column_stack([self.columns[f"bid_volume_{i}"] for i in range(1, BOOK_DEPTH + 1)])
+
+    def ask_prices(self) -> np.ndarray:
+        return np.column_stack([self.columns[f"ask_price_{i}"] for i in range(1, BOOK_DEPTH + 1)])
+
+    def ask_volumes(self) -> np.ndarray:
+        return np.column_stack([self.columns[f"ask_volume_{i}"] for i in range(1, BOOK_DEPTH + 1)])
+
+
+# Columns that tell price files from trade files and other CSVs
+PRICE_FILE_COLUMNS = ("day", "timestamp", "product", "mid_price")
+
+
+def is_price_file(path: str) -> bool:
+    """Whether path is a CSV with the header of an exchange price file."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\r\n").split(";")
+    return all(column in header for column in PRICE_FILE_COLUMNS)
+
+
+def find_price_files(directory: str) -> List[str]:
+    """Price files anywhere under directory: round files (prices_round_N_day_D.csv) and exported
+    submission logs; trade files and cache directories are skipped."""
+    paths = glob.glob(os.path.join(directory, "**", "*.csv"), recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path) and is_price_file(path))
+
+
+def parse_prices(path: str) -> Dict[Product, PriceTable]:
+    """Parse a semicolon separated price file into a PriceTable per product."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\r\n").split(";")
+        product_idx = header.index("product")
+        rows_by_product: Dict[Product, List[List[str]]] = {}
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            row = line.split(";")
+            rows_by_product.setdefault(row[product_idx], []).append(row)
+
+    tables = {}
+    for product, rows in rows_by_product.items():
+        columns = {}
+        for idx, column in enumerate(header):
+            if idx == product_idx:
+                continue
+            dtype = _column_dtype(column)
+            values = [row[idx] or "0" for row in rows]
+            if dtype.kind == "i":
+                # Prices in some exports are written as "10000.0"
+                columns[column] = np.array(values, dtype=np.float64).astype(np.int64)
+            else:
+                columns[column] = np.array(values, dtype=np.float64)
+        tables[product] = PriceTable(product, columns)
+
+    return tables
+
+
+def write_cache(path: str, tables: Dict[Product, PriceTable]) -> None:
+    arrays = {
+        f"{product}__{column}": values
+        for product, table in tables.items()
+        for column, values in table.columns.items()
+    }
+    layout = {product: list(table.columns) for product, table in tables.items()}
+    write_arrays(path, CACHE_KIND, CACHE_VERSION, arrays, {"products": layout})
+
+
+def read_cache(path: str) -> Dict[Product, PriceTable]:
+    """Return memory-mapped tables for path, or {} if the cache is missing or stale."""
+    cached = read_arrays(path, CACHE_KIND, CACHE_VERSION)
+    if cached is None:
+        return {}
+
+    arrays, extra = cached
+    return {
+        product: PriceTable(product, {column: arrays[f"{product}__{column}"] for column in columns})
+        for product, columns in extra["products"].items()
+    }
+
+
+def load_prices(path: str, use_cache: bool = True) -> Dict[Product, PriceTable]:
+    """Load a price file, parsing it only if no valid cache exists next to it."""
+    if not use_cache:
+        return parse_prices(path)
+
+    tables = read_cache(path)
+    if tables:
+        return tables
+
+    write_cache(path, parse_prices(path))
+    return read_cache(path)
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.data.prices import BOOK_DEPTH
+from src.model.compact import Listing, OrderDepth
+from src.model.datamodel import Observation, Product, TradingState
+
+# Ticks read straight from price files, a bounded chunk of lines at a time, so a replay over
+# any number of days holds one chunk per open file instead of whole tables.
+
+# Lines read ahead per file
+DEFAULT_CHUNK_SIZE = 1024
+DENOMINATION = "SEASHELLS"
+
+PRICE_FILE = re.compile(r"prices_round_(-?\d+)_day_(-?\d+)\.csv$")
+
+# (round, day) of a price file; files without a round in their name sort as round 0
+Session = Tuple[int, int]
+
+
+class PriceRow:
+    """One product's book on one tick."""
+    __slots__ = ("day", "timestamp", "product", "bids", "asks", "mid_price")
+
+    def __init__(self, day: int, timestamp: int, product: Product, bids: List[Tuple[int, int]],
+                 asks: List[Tuple[int, int]], mid_price: float) -> None:
+        self.day = day
+        self.timestamp = timestamp
+        self.product = product
+        # (price, volume) best first, volumes positive on both sides
+        self.bids = bids
+        self.asks = asks
+        self.mid_price = mid_price
+
+    def order_depth(self) -> OrderDepth:
+        order_depth = OrderDepth()
+        for price, volume in self.bids:
+            order_depth.buy_orders[price] = volume
+        for price, volume in self.asks:
+            order_depth.sell_orders[price] = -volume
+        return order_depth
+
+
+class Tick:
+    """Every product's row at one timestamp of one session."""
+    __slots__ = ("session", "timestamp", "rows")
+
+    def __init__(self, session: Session, timestamp: int, rows: Dict[Product, PriceRow]) -> None:
+        self.session = session
+        self.timestamp = timestamp
+        self.rows = rows
+
+
+def _level(price: str, volume: str) -> Optional[Tuple[int, int]]:
+    if not price or not volume:
+        return None
+    # Prices in some exports are written as "10000.0"
+    return int(float(price)), int(float(volume))
+
+
+def iter_rows(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[PriceRow]:
+    """Rows of a price file in file order, reading at most chunk_size lines ahead."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\r\n").split(";")
+        index = {column: idx for idx, column in enumerate(header)}
+        day_idx, timestamp_idx, product_idx, mid_idx = (
+            index["day"], index["timestamp"], index["product"], index["mid_price"]
+        )
+        bid_columns = [(index[f"bid_price_{i}"], index[f"bid_volume_{i}"]) for i in range(1, BOOK_DEPTH + 1)]
+        ask_columns = [(index[f"ask_price_{i}"], index[f"ask_volume_{i}"]) for i in range(1, BOOK_DEPTH + 1)]
+
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+
+            for line in lines:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                row = line.split(";")
+                bids = [level for level in (_level(row[p], row[v]) for p, v in bid_columns) if level]
+                asks = [level for level in (_level(row[p], row[v]) for p, v in ask_columns) if level]
+                yield PriceRow(
+                    int(row[day_idx]), int(row[timestamp_idx]), row[product_idx], bids, asks, float(row[mid_idx] or 0)
+                )
+
+
+def session_of(path: str) -> Session:
+    """(round, day) from a prices_round_N_day_D.csv name, otherwise round 0 and the first row's day."""
+    match = PRICE_FILE.search(os.path.basename(path))
+    if match:
+        return int(match.group(1)), int(match.group(2))
+
+    for row in iter_rows(path, 1):
+        return 0, row.day
+    return 0, 0
+
+
+def iter_ticks(paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tick]:
+    """
+    Ticks of every file in (round, day, timestamp) order. Sessions are read one after another;
+    files of the same session are merged on timestamp.
+    """
+    sessions: Dict[Session, List[str]] = {}
+    for path in paths:
+        sessions.setdefault(session_of(path), []).append(path)
+
+    for session in sorted(sessions):
+        rows = heapq.merge(
+            *(iter_rows(path, chunk_size) for path in sessions[session]), key=lambda row: (row.day, row.timestamp)
+        )
+        # A file holding several days still yields one session per day
+        for (day, timestamp), group in itertools.groupby(rows, key=lambda row: (row.day, row.timestamp)):
+            yield Tick((session[0], day), timestamp, {row.product: row for row in group})
+
+
+def stream_states(paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[Tick, TradingState]]:
+    """
+    (tick, TradingState) for every tick, in order; tick.session tells where a new exchange run
+    starts. traderData, own_trades and position are left empty for the caller to carry over
+    from the previous tick of the same session.
+    """
+    listings: Dict[Product, Listing] = {}
+    for tick in iter_ticks(paths, chunk_size):
+        order_depths = {}
+        for product, row in tick.rows.items():
+            order_depths[product] = row.order_depth()
+            if product not in listings:
+                listings[product] = Listing(product, product, DENOMINATION)
+
+        state = TradingState(
+            "",
+            tick.timestamp,
+            {product: listings[product] for product in order_depths},
+            order_depths,
+            {},
+            {},
+            {},
+            Observation({}, {}),
+        )
+        yield tick, state
@@ -0,0 +1,86 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.model.compact import Trade
+from src.model.datamodel import Symbol
+
+TRADE_FILE = re.compile(r"trades_round_(-?\d+)_day_(-?\d+)\.csv$")
+
+# (round, day, timestamp); rounds reuse day numbers
+TickKey = Tuple[int, int, int]
+
+EMPTY: Dict[Symbol, List[Trade]] = {}
+
+
+def day_of(path: str) -> Optional[int]:
+    """Day from a trades_round_N_day_D.csv name; trade files carry no day column."""
+    match = TRADE_FILE.search(os.path.basename(path))
+    return int(match.group(2)) if match else None
+
+
+def round_of(path: str) -> Optional[int]:
+    match = TRADE_FILE.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def parse_trades(path: str) -> List[Trade]:
+    """Parse a semicolon separated trades file (timestamp, buyer, seller, symbol, currency, price, quantity)."""
+    trades = []
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\r\n").split(";")
+        index = {column: idx for idx, column in enumerate(header)}
+        timestamp_idx, buyer_idx, seller_idx, symbol_idx, price_idx, quantity_idx = (
+            index["timestamp"], index["buyer"], index["seller"], index["symbol"], index["price"], index["quantity"]
+        )
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            row = line.split(";")
+            trades.append(Trade(
+                row[symbol_idx],
+                # Prices in some exports are written as "10000.0"
+                int(float(row[price_idx])),
+                int(row[quantity_idx]),
+                row[buyer_idx],
+                row[seller_idx],
+                int(row[timestamp_idx]),
+            ))
+    return trades
+
+
+class TradeIndex:
+    """Market trades grouped by (round, day, timestamp) and symbol, for O(1) lookup per tick."""
+
+    def __init__(self) -> None:
+        self.ticks: Dict[TickKey, Dict[Symbol, List[Trade]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(trades) for by_symbol in self.ticks.values() for trades in by_symbol.values())
+
+    def add(self, day: int, trades: List[Trade], round_: int = 0) -> None:
+        for trade in trades:
+            key = (round_, day, trade.timestamp)
+            by_symbol = self.ticks.get(key)
+            if by_symbol is None:
+                by_symbol = self.ticks[key] = {}
+            by_symbol.setdefault(trade.symbol, []).append(trade)
+
+    def at(self, day: int, timestamp: int, round_: int = 0) -> Dict[Symbol, List[Trade]]:
+        """Trades printed at exactly this tick, shared between calls and not to be mutated."""
+        return self.ticks.get((round_, day, timestamp), EMPTY)
+
+    @classmethod
+    def from_files(cls, paths: List[str], day: int = None, round_: int = 0) -> "TradeIndex":
+        """day (and round_) are required for files whose name does not carry them."""
+        index = cls()
+        for path in paths:
+            file_day = day_of(path)
+            if file_day is None:
+                if day is None:
+                    raise ValueError(f"cannot tell the day of {path}, pass it explicitly")
+                index.add(day, parse_trades(path), round_)
+            else:
+                index.add(file_day, parse_trades(path), round_of(path))
+        return index
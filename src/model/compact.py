@@ -0,0 +1,128 @@
+import json
+from json import JSONEncoder
+from operator import attrgetter
+from typing import Any, Dict, List
+
+from src.model.datamodel import Product, Symbol, UserId
+
+# Drop-in replacements for the datamodel classes that do not carry a per-instance __dict__.
+# Constructors, attribute names and string forms match src/model/datamodel.py. __dict__ is a
+# property built from the slots, so ProsperityEncoder and TradingState.toJSON still serialise
+# them. Slots are declared in the order the Logger writes the fields, and CompactEncoder emits
+# these objects, and the exchange's datamodel objects of the same names, as arrays in that order.
+
+
+class _Slotted:
+    __slots__ = ()
+
+    @property
+    def __dict__(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Listing(_Slotted):
+    __slots__ = ("symbol", "product", "denomination")
+
+    def __init__(self, symbol: Symbol, product: Product, denomination: Product):
+        self.symbol = symbol
+        self.product = product
+        self.denomination = denomination
+
+
+class ConversionObservation(_Slotted):
+    __slots__ = ("bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sugarPrice", "sunlightIndex")
+
+    def __init__(self, bidPrice: float, askPrice: float, transportFees: float, exportTariff: float, importTariff: float, sugarPrice: float, sunlightIndex: float):
+        self.bidPrice = bidPrice
+        self.askPrice = askPrice
+        self.transportFees = transportFees
+        self.exportTariff = exportTariff
+        self.importTariff = importTariff
+        self.sugarPrice = sugarPrice
+        self.sunlightIndex = sunlightIndex
+
+
+class Order(_Slotted):
+    __slots__ = ("symbol", "price", "quantity")
+
+    def __init__(self, symbol: Symbol, price: int, quantity: int) -> None:
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+
+    def __str__(self) -> str:
+        return "(" + self.symbol + ", " + str(self.price) + ", " + str(self.quantity) + ")"
+
+    def __repr__(self) -> str:
+        return "(" + self.symbol + ", " + str(self.price) + ", " + str(self.quantity) + ")"
+
+
+class OrderDepth(_Slotted):
+    __slots__ = ("buy_orders", "sell_orders")
+
+    def __init__(self):
+        self.buy_orders: Dict[int, int] = {}
+        self.sell_orders: Dict[int, int] = {}
+
+
+class Trade(_Slotted):
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
+    def __init__(self, symbol: Symbol, price: int, quantity: int, buyer: UserId=None, seller: UserId=None, timestamp: int=0) -> None:
+        self.symbol = symbol
+        self.price: int = price
+        self.quantity: int = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
+
+    def __repr__(self) -> str:
+        return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
+
+
+# Field order of the array form, looked up by class name so any datamodel's classes match
+FIELDS = {cls.__name__: cls.__slots__ for cls in (Listing, ConversionObservation, Order, OrderDepth, Trade)}
+
+_getters: Dict[type, Any] = {}
+
+
+def _getter(cls: type) -> Any:
+    getter = _getters.get(cls)
+    if getter is None:
+        fields = FIELDS.get(cls.__name__)
+        getter = _getters[cls] = attrgetter(*fields) if fields else None
+    return getter
+
+
+def rows(objects: List[Any]) -> List[Any]:
+    """
+    Objects of one class as tuples in slot order, the arrays CompactEncoder writes. The tuples
+    are built in C, while CompactEncoder.default costs a Python call per object.
+    """
+    if not objects:
+        return []
+    getter = _getter(type(objects[0]))
+    if getter is None:
+        return objects
+    return list(map(getter, objects))
+
+
+class CompactEncoder(JSONEncoder):
+    """
+    Encodes Listing, ConversionObservation, Order, OrderDepth and Trade objects, compact or not,
+    as arrays in slot order, i.e. the Logger's compressed layout. Anything else goes through
+    __dict__ like ProsperityEncoder.
+    """
+
+    def default(self, o):
+        getter = _getters.get(type(o)) or _getter(type(o))
+        if getter is not None:
+            return getter(o)
+        return o.__dict__
+
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, cls=CompactEncoder, separators=(",", ":"))
@@ -0,0 +1,307 @@
+import json
+import zlib
+from base64 import b85decode, b85encode
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.model.compact import CompactEncoder, rows
+from src.model.datamodel import Listing, Observation, Order, OrderDepth, Symbol, Trade, TradingState
+
+
+# EAGER formats every print immediately, LAZY keeps the raw arguments in a buffer and
+# formats only what fits the log line at flush, DISABLED turns print and flush into no-ops
+EAGER = "eager"
+LAZY = "lazy"
+DISABLED = "disabled"
+
+# Prints buffered in LAZY mode before they are formatted into one entry. Truncation keeps the
+# start of the logs, so once that entry is longer than max_log_length later prints of the tick
+# are dropped.
+LAZY_CAPACITY = 1024
+
+# FULL writes every book as is. DELTA writes only the levels that changed since the previous
+# flush, and the full books as a keyframe at least every KEYFRAME_INTERVAL flushes so a reader
+# can resync after lost lines; DELTA_ZLIB also compresses the payload when that is shorter.
+# Only DepthDecoder reads the delta forms.
+FULL = "full"
+DELTA = "delta"
+DELTA_ZLIB = "delta_zlib"
+
+KEYFRAME_INTERVAL = 100
+
+DELTA_TAG = "d"
+ZLIB_TAG = "z"
+# Marks a delta entry that replaces the symbol's book instead of changing it
+REPLACE = 1
+
+# Per symbol (buy_orders, sell_orders)
+Books = Dict[Symbol, Tuple[Dict[int, int], Dict[int, int]]]
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+def _level_changes(previous: Dict[Any, int], current: Dict[Any, int]) -> Dict[Any, int]:
+    # Volume 0 never appears in a book, so it marks a level that is gone
+    changes = {price: volume for price, volume in current.items() if previous.get(price) != volume}
+    for price in previous:
+        if price not in current:
+            changes[price] = 0
+    return changes
+
+
+class Logger:
+    def __init__(self, mode: str = EAGER, depth_encoding: str = FULL) -> None:
+        self.logs = ""
+        self.max_log_length = 3750
+        self.entries: List[Tuple[tuple, str, str]] = []
+        self.set_mode(mode)
+        self.set_depth_encoding(depth_encoding)
+
+    def set_depth_encoding(self, depth_encoding: str) -> None:
+        if depth_encoding not in (FULL, DELTA, DELTA_ZLIB):
+            raise ValueError(f"unknown depth encoding {depth_encoding}")
+
+        self.depth_encoding = depth_encoding
+        self.previous_books: Books = {}
+        # None forces a keyframe on the next flush
+        self.flushes_since_keyframe: Optional[int] = None
+
+    def set_mode(self, mode: str) -> None:
+        if mode not in (EAGER, LAZY, DISABLED):
+            raise ValueError(f"unknown logger mode {mode}")
+
+        self.mode = mode
+        self.logs = ""
+        self.entries.clear()
+
+        # Instance attributes shadow the methods, so the hot path never checks the mode
+        self.__dict__.pop("print", None)
+        self.__dict__.pop("flush", None)
+        if mode == LAZY:
+            self.print = self.print_lazy
+        elif mode == DISABLED:
+            self.print = _noop
+            self.flush = _noop
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
+        self.logs += sep.join(map(str, objects)) + end
+
+    def print_lazy(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
+        self.entries.append((objects, sep, end))
+        if len(self.entries) >= LAZY_CAPACITY:
+            self.compact_entries()
+
+    def compact_entries(self) -> None:
+        logs = self.pending_logs(self.max_log_length)
+        self.entries = [((logs,), "", "")]
+        if len(logs) > self.max_log_length:
+            # Nothing printed later this tick can survive truncation
+            self.print = _noop
+
+    def clear(self) -> None:
+        self.logs = ""
+        self.entries.clear()
+        if self.mode == LAZY:
+            self.print = self.print_lazy
+
+    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
+        print(self.encode(state, orders, conversions, trader_data))
+        self.clear()
+
+    def discard(self) -> None:
+        """Drop this tick's logs without printing anything."""
+        self.clear()
+
+    def pending_logs(self, max_length: int) -> str:
+        """The logs of this tick, formatted only as far as needed to truncate them to max_length."""
+        if self.mode != LAZY:
+            return self.logs
+
+        parts = []
+        length = 0
+        for objects, sep, end in self.entries:
+            text = sep.join(map(str, objects)) + end
+            parts.append(text)
+            length += len(text)
+            if length > max_length:
+                break
+
+        return "".join(parts)
+
+    def encode(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> str:
+        # Everything except the three free-text fields is serialised exactly once
+        compressed_state = self.compress_state(state, "")
+        head = "[[" + self.to_json(state.timestamp) + ","
+        state_tail = "," + self.to_json(compressed_state[2:])[1:-1] + "],"
+        middle = self.to_json(self.compress_orders(orders)) + "," + self.to_json(conversions) + ","
+
+        # Length of the full line with the three strings empty: three "", one comma and the closing bracket
+        base_length = len(head) + len(state_tail) + len(middle) + 3 * 2 + 2
+
+        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
+        max_item_length = (self.max_log_length - base_length) // 3
+
+        return (
+            head
+            + self.to_json(self.truncate(state.traderData, max_item_length))
+            + state_tail
+            + middle
+            + self.to_json(self.truncate(trader_data, max_item_length))
+            + ","
+            + self.to_json(self.truncate(self.pending_logs(max_item_length), max_item_length))
+            + "]"
+        )
+
+    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
+        return [
+            state.timestamp,
+            trader_data,
+            self.compress_listings(state.listings),
+            self.encode_order_depths(state.order_depths),
+            self.compress_trades(state.own_trades),
+            self.compress_trades(state.market_trades),
+            state.position,
+            self.compress_observations(state.observations),
+        ]
+
+    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[Any]:
+        # [symbol, product, denomination]
+        return rows(list(listings.values()))
+
+    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
+        compressed = {}
+        for symbol, order_depth in order_depths.items():
+            compressed[symbol] = [
+                order_depth.buy_orders, order_depth.sell_orders]
+
+        return compressed
+
+    def encode_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> Any:
+        full = self.compress_order_depths(order_depths)
+        if self.depth_encoding == FULL:
+            return full
+
+        books = {
+            symbol: (dict(order_depth.buy_orders), dict(order_depth.sell_orders))
+            for symbol, order_depth in order_depths.items()
+        }
+
+        # The full books double as keyframes, and are sent whenever the delta is not shorter
+        payload = full
+        payload_json = self.to_json(full)
+        if self.flushes_since_keyframe is not None and self.flushes_since_keyframe < KEYFRAME_INTERVAL - 1:
+            delta = [DELTA_TAG, self.depth_changes(books)]
+            delta_json = self.to_json(delta)
+            if len(delta_json) < len(payload_json):
+                payload, payload_json = delta, delta_json
+
+        self.flushes_since_keyframe = 0 if payload is full else self.flushes_since_keyframe + 1
+        self.previous_books = books
+
+        if self.depth_encoding == DELTA_ZLIB:
+            packed = b85encode(zlib.compress(payload_json.encode("utf-8"), 9)).decode("ascii")
+            # Short payloads grow when compressed
+            if len(packed) + len(ZLIB_TAG) + 6 < len(payload_json):
+                return [ZLIB_TAG, packed]
+
+        return payload
+
+    def depth_changes(self, books: Books) -> Dict[Symbol, Any]:
+        changes: Dict[Symbol, Any] = {}
+        for symbol, (buy, sell) in books.items():
+            if symbol not in self.previous_books:
+                # New symbols are written out even when empty, a reader must learn they exist
+                changes[symbol] = [buy, sell, REPLACE]
+                continue
+            previous_buy, previous_sell = self.previous_books[symbol]
+            buy_changes = _level_changes(previous_buy, buy)
+            sell_changes = _level_changes(previous_sell, sell)
+            if not buy_changes and not sell_changes:
+                continue
+            # A book that moved entirely is shorter written out than as changes
+            if len(buy_changes) + len(sell_changes) > len(buy) + len(sell):
+                changes[symbol] = [buy, sell, REPLACE]
+            else:
+                changes[symbol] = [buy_changes, sell_changes]
+
+        for symbol in self.previous_books:
+            if symbol not in books:
+                changes[symbol] = None
+
+        return changes
+
+    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[Any]:
+        # [symbol, price, quantity, buyer, seller, timestamp]
+        compressed = []
+        for arr in trades.values():
+            compressed.extend(rows(arr))
+
+        return compressed
+
+    def compress_observations(self, observations: Observation) -> list[Any]:
+        # [bidPrice, askPrice, transportFees, exportTariff, importTariff, sugarPrice, sunlightIndex]
+        conversion_observations = observations.conversionObservations
+        compressed = dict(zip(conversion_observations, rows(list(conversion_observations.values()))))
+
+        return [observations.plainValueObservations, compressed]
+
+    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[Any]:
+        # [symbol, price, quantity]
+        compressed = []
+        for arr in orders.values():
+            compressed.extend(rows(arr))
+
+        return compressed
+
+    def to_json(self, value: Any) -> str:
+        return json.dumps(value, cls=CompactEncoder, separators=(",", ":"))
+
+    def truncate(self, value: str, max_length: int) -> str:
+        if len(value) <= max_length:
+            return value
+
+        return value[: max_length - 3] + "..."
+
+
+class DepthDecoder:
+    """
+    Rebuilds the order depths of flushed lines, fed in order, as FULL would have written them:
+    {symbol: [buy_orders, sell_orders]} with string prices. Returns None for delta lines
+    before the first keyframe.
+    """
+
+    def __init__(self) -> None:
+        self.books: Optional[Dict[Symbol, List[Dict[str, int]]]] = None
+
+    def decode(self, encoded: Any) -> Optional[Dict[Symbol, List[Dict[str, int]]]]:
+        if isinstance(encoded, dict):
+            self.books = {symbol: [dict(buy), dict(sell)] for symbol, (buy, sell) in encoded.items()}
+            return encoded
+
+        tag, payload = encoded
+        if tag == ZLIB_TAG:
+            return self.decode(json.loads(zlib.decompress(b85decode(payload))))
+        if tag != DELTA_TAG:
+            raise ValueError(f"unknown order depth tag {tag}")
+        if self.books is None:
+            return None
+
+        for symbol, changes in payload.items():
+            if changes is None:
+                self.books.pop(symbol, None)
+            elif len(changes) == 3:
+                self.books[symbol] = [dict(changes[0]), dict(changes[1])]
+            else:
+                book = self.books.setdefault(symbol, [{}, {}])
+                for side, side_changes in zip(book, changes):
+                    for price, volume in side_changes.items():
+                        if volume == 0:
+                            side.pop(price, None)
+                        else:
+                            side[price] = volume
+
+        return {symbol: [dict(buy), dict(sell)] for symbol, (buy, sell) in self.books.items()}
+
+
+logger = Logger()
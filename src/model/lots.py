@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class LotBook:
+    """
+    Inventory lots of one product, one per purchase price, kept sorted with bisect.
+
+    Prices are stored negated in ascending order, i.e. most expensive lot first, so the
+    cheapest lot is at the end of the lists and can be popped in O(1).
+    """
+    __slots__ = ("keys", "quantities")
+
+    def __init__(self) -> None:
+        self.keys: List[int] = []
+        self.quantities: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def add(self, price: int, quantity: int) -> None:
+        key = -price
+        idx = bisect_left(self.keys, key)
+        if idx < len(self.keys) and self.keys[idx] == key:
+            self.quantities[idx] += quantity
+        else:
+            self.keys.insert(idx, key)
+            self.quantities.insert(idx, quantity)
+
+    def remove(self, price: int, quantity: int) -> None:
+        key = -price
+        idx = bisect_left(self.keys, key)
+        if idx == len(self.keys) or self.keys[idx] != key:
+            raise ValueError('purchase price not found in history')
+
+        if self.quantities[idx] < quantity:
+            raise ValueError('not enough quantity at that price to remove')
+
+        self.quantities[idx] -= quantity
+        if self.quantities[idx] == 0:
+            del self.keys[idx]
+            del self.quantities[idx]
+
+    def cheapest(self) -> Tuple[int, int]:
+        return -self.keys[-1], self.quantities[-1]
+
+    def pop_cheapest(self) -> Tuple[int, int]:
+        return -self.keys.pop(), self.quantities.pop()
+
+    def quantity(self, price: int) -> int:
+        key = -price
+        idx = bisect_left(self.keys, key)
+        if idx < len(self.keys) and self.keys[idx] == key:
+            return self.quantities[idx]
+        return 0
+
+    def total_quantity(self) -> int:
+        return sum(self.quantities)
+
+    def items(self) -> Iterable[Tuple[int, int]]:
+        """(price, quantity) from the cheapest lot up."""
+        return zip((-key for key in reversed(self.keys)), reversed(self.quantities))
+
+    def to_dict(self) -> Dict[int, int]:
+        return dict(self.items())
+
+    def match_bids(self, bid_prices: Sequence[int], bid_volumes: Sequence[int], max_quantity: int) -> List[Tuple[int, int]]:
+        """
+        Sell the cheapest lots into the bids, in the order given, wherever a bid pays more
+        than the lot cost. Stops as soon as the next sale would take the total sold past
+        max_quantity. Sold quantities are removed from the book; returns (bid price, qty).
+        """
+        sales = []
+        sold = 0
+        j = 0
+        remaining_bid = bid_volumes[0] if bid_volumes else 0
+
+        while self.keys and j < len(bid_prices):
+            lot_price = -self.keys[-1]
+            bid_price = bid_prices[j]
+
+            if bid_price <= lot_price or remaining_bid <= 0:
+                j += 1
+                remaining_bid = bid_volumes[j] if j < len(bid_volumes) else 0
+                continue
+
+            quantity = min(self.quantities[-1], remaining_bid)
+            if sold + quantity > max_quantity:
+                break
+
+            sales.append((bid_price, quantity))
+            sold += quantity
+            remaining_bid -= quantity
+            self.quantities[-1] -= quantity
+
+            if remaining_bid == 0:
+                j += 1
+                remaining_bid = bid_volumes[j] if j < len(bid_volumes) else 0
+            if self.quantities[-1] == 0:
+                self.keys.pop()
+                self.quantities.pop()
+
+        return sales
+
+    def to_flat(self) -> List[int]:
+        """[price, qty, price, qty, ...] from the cheapest lot up."""
+        flat = []
+        for key, quantity in zip(reversed(self.keys), reversed(self.quantities)):
+            flat.append(-key)
+            flat.append(quantity)
+        return flat
+
+    @classmethod
+    def from_flat(cls, flat: Sequence[int]) -> "LotBook":
+        book = cls()
+        lots = sorted(zip(flat[::2], flat[1::2]), reverse=True)
+        book.keys = [-price for price, _ in lots]
+        book.quantities = [quantity for _, quantity in lots]
+        return book
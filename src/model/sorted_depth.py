@@ -0,0 +1,83 @@
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+from src.model.datamodel import OrderDepth
+
+
+class SortedDepth:
+    """
+    One product's OrderDepth sorted once per tick. Levels are stored best first: bids
+    descending, asks ascending. Volumes keep the OrderDepth sign convention (asks negative).
+    """
+    __slots__ = ("bid_prices", "bid_volumes", "ask_prices", "ask_volumes", "best_bid", "best_ask",
+                 "_bid_cumulative", "_ask_cumulative")
+
+    def __init__(self, order_depth: OrderDepth) -> None:
+        buy_orders = order_depth.buy_orders
+        sell_orders = order_depth.sell_orders
+
+        self.bid_prices: List[int] = sorted(buy_orders, reverse=True)
+        self.bid_volumes: List[int] = [buy_orders[price] for price in self.bid_prices]
+        self.ask_prices: List[int] = sorted(sell_orders)
+        self.ask_volumes: List[int] = [sell_orders[price] for price in self.ask_prices]
+
+        self.best_bid: Optional[int] = self.bid_prices[0] if self.bid_prices else None
+        self.best_ask: Optional[int] = self.ask_prices[0] if self.ask_prices else None
+
+        self._bid_cumulative: Optional[List[int]] = None
+        self._ask_cumulative: Optional[List[int]] = None
+
+    @property
+    def two_sided(self) -> bool:
+        return self.best_bid is not None and self.best_ask is not None
+
+    @property
+    def best_bid_volume(self) -> int:
+        return self.bid_volumes[0] if self.bid_volumes else 0
+
+    @property
+    def best_ask_volume(self) -> int:
+        return self.ask_volumes[0] if self.ask_volumes else 0
+
+    @property
+    def spread(self) -> Optional[int]:
+        if not self.two_sided:
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        if not self.two_sided:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def bid_cumulative(self) -> List[int]:
+        # Volume available at each bid level or better
+        if self._bid_cumulative is None:
+            self._bid_cumulative = list(accumulate(self.bid_volumes))
+        return self._bid_cumulative
+
+    @property
+    def ask_cumulative(self) -> List[int]:
+        if self._ask_cumulative is None:
+            self._ask_cumulative = list(accumulate(self.ask_volumes))
+        return self._ask_cumulative
+
+    def bid_levels(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.bid_prices, self.bid_volumes)
+
+    def ask_levels(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.ask_prices, self.ask_volumes)
+
+    def total_volume(self) -> int:
+        return sum(self.bid_volumes) - sum(self.ask_volumes)
+
+    def notional(self) -> int:
+        """Sum of price * |volume| over every level on both sides."""
+        total = 0
+        for price, volume in zip(self.bid_prices, self.bid_volumes):
+            total += price * volume
+        for price, volume in zip(self.ask_prices, self.ask_volumes):
+            total -= price * volume
+        return total
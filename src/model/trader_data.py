@@ -0,0 +1,119 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from src.model.lots import LotBook
+
+# traderData layout: [TRADER_DATA_VERSION, field_0, field_1, ...]. Fields are positional and
+# only ever appended, so a decoder treats missing trailing fields as empty. Bump the version
+# only when an existing field changes meaning.
+TRADER_DATA_VERSION = 1
+
+# How every string dumps() writes starts
+VERSION_PREFIX = f"[{TRADER_DATA_VERSION},"
+
+
+def dumps(fields: List[Any]) -> str:
+    return json.dumps([TRADER_DATA_VERSION, *fields], separators=(",", ":"))
+
+
+def loads(trader_data: str) -> Optional[List[Any]]:
+    """The fields of trader_data, or None when it is empty or written by another version."""
+    if not trader_data:
+        return None
+
+    try:
+        data = json.loads(trader_data)
+    except ValueError:
+        return None
+
+    if not isinstance(data, list) or not data or data[0] != TRADER_DATA_VERSION:
+        return None
+
+    return data[1:]
+
+
+def encode_lots(lots: Dict[str, LotBook]) -> Dict[str, List[int]]:
+    """{product: LotBook} as {product: [price, qty, price, qty, ...]}, cheapest lot first."""
+    return {product: book.to_flat() for product, book in lots.items() if book}
+
+
+def decode_lots(packed: Dict[str, List[int]]) -> Dict[str, LotBook]:
+    return {product: LotBook.from_flat(flat) for product, flat in packed.items()}
+
+
+class FieldCodec:
+    """How one traderData field becomes an object and back; empty() builds a missing field."""
+    __slots__ = ("decode", "encode", "empty")
+
+    def __init__(self, decode: Callable[[Any], Any], encode: Callable[[Any], Any], empty: Callable[[], Any]) -> None:
+        self.decode = decode
+        self.encode = encode
+        self.empty = empty
+
+
+class LazyFields:
+    """
+    The fields of a traderData string, parsed on the first access to any field and decoded one
+    field at a time. Only fields marked dirty are encoded again; if none is, encode() returns
+    the string it was built from, so ticks that change nothing pay no serialisation at all.
+    A source this version cannot read is replaced by a fresh encoding instead.
+    """
+    __slots__ = ("source", "codecs", "raw", "readable", "values", "dirty")
+
+    def __init__(self, source: str, codecs: Sequence[FieldCodec]) -> None:
+        self.source = source
+        self.codecs = codecs
+        # JSON values of every field, filled on first access
+        self.raw: Optional[List[Any]] = None
+        # Whether source parsed as this version's traderData, known once raw is filled
+        self.readable = False
+        self.values: Dict[int, Any] = {}
+        self.dirty: Set[int] = set()
+
+    def get(self, idx: int) -> Any:
+        if idx in self.values:
+            return self.values[idx]
+
+        if self.raw is None:
+            self.parse()
+        codec = self.codecs[idx]
+        value = self.values[idx] = codec.decode(self.raw[idx]) if idx < len(self.raw) else codec.empty()
+        return value
+
+    def parse(self) -> None:
+        fields = loads(self.source)
+        self.readable = fields is not None
+        self.raw = fields or []
+
+    def current(self) -> bool:
+        """Whether source can be handed back as is: empty, or written by this version."""
+        if not self.source:
+            return True
+        if self.raw is not None:
+            return self.readable
+        # Not parsed yet; the prefix rules out other versions and other formats without parsing
+        return self.source.startswith(VERSION_PREFIX)
+
+    def set(self, idx: int, value: Any) -> None:
+        self.values[idx] = value
+        self.dirty.add(idx)
+
+    def mark_dirty(self, idx: int) -> None:
+        self.dirty.add(idx)
+
+    def encode(self) -> str:
+        if not self.dirty and self.current():
+            return self.source
+
+        if self.raw is None:
+            self.parse()
+        fields = []
+        for idx, codec in enumerate(self.codecs):
+            if idx in self.dirty or idx >= len(self.raw):
+                fields.append(codec.encode(self.get(idx)))
+            else:
+                # Untouched fields are written back as parsed, without decoding them
+                fields.append(self.raw[idx])
+        # Fields appended by a newer writer are kept as they are
+        fields.extend(self.raw[len(self.codecs):])
+        return dumps(fields)
@@ -0,0 +1,71 @@
+from time import perf_counter_ns
+from typing import Callable, Dict
+
+# Deadline-aware degradation for Trader.run. The exchange kills run() calls that take longer
+# than its limit, so optional steps are skipped once a given share of the budget has gone:
+#
+#     deadline.begin()
+#     ...
+#     if deadline.allows(LOGGING):
+#         logger.flush(...)
+#
+# Required work (decoding traderData, primary products, encoding) is never skipped, so run()
+# still returns valid orders and traderData. Skips are counted per step for the report.
+
+# Optional steps, cheapest to lose first
+LOGGING = "logging"
+HISTORY = "history"
+SECONDARY = "secondary"
+
+# The exchange's limit per run() call
+DEFAULT_BUDGET_NS = 900_000_000
+
+# Share of the budget elapsed since run() was entered after which each step is skipped
+DEFAULT_THRESHOLDS = {
+    LOGGING: 0.5,
+    HISTORY: 0.65,
+    SECONDARY: 0.8,
+}
+
+
+class DeadlineGuard:
+    __slots__ = ("budget_ns", "limits", "clock", "started", "runs", "degraded_runs", "counts", "degraded")
+
+    def __init__(self, budget_ns: int = DEFAULT_BUDGET_NS, thresholds: Dict[str, float] = None,
+                 clock: Callable[[], int] = perf_counter_ns) -> None:
+        thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        self.budget_ns = budget_ns
+        self.limits = {step: int(budget_ns * share) for step, share in thresholds.items()}
+        self.clock = clock
+        self.started = 0
+        self.runs = 0
+        self.degraded_runs = 0
+        self.counts = {step: 0 for step in thresholds}
+        # Whether the current run has skipped anything yet
+        self.degraded = False
+
+    def begin(self) -> None:
+        self.started = self.clock()
+        self.runs += 1
+        self.degraded = False
+
+    def elapsed_ns(self) -> int:
+        return self.clock() - self.started
+
+    def allows(self, step: str) -> bool:
+        """Whether there is time left for step; a refusal is counted."""
+        if self.clock() - self.started < self.limits[step]:
+            return True
+
+        self.counts[step] += 1
+        if not self.degraded:
+            self.degraded = True
+            self.degraded_runs += 1
+        return False
+
+    def report(self) -> Dict[str, int]:
+        return {"runs": self.runs, "degraded_runs": self.degraded_runs, **self.counts}
+
+    def format_report(self) -> str:
+        skipped = ", ".join(f"{step} {count}" for step, count in self.counts.items())
+        return f"deadline: {self.degraded_runs}/{self.runs} runs degraded (skipped: {skipped})"
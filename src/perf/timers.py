@@ -0,0 +1,118 @@
+import sys
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Phases of Trader.run that every variant marks
+DECODE = "decode"
+SORT = "sort"
+ORDERS = "orders"
+ENCODE = "encode"
+FLUSH = "flush"
+
+# Samples kept per (phase, product); a day is 10k ticks
+DEFAULT_CAPACITY = 100_000
+
+PERCENTILES = (50, 95, 99)
+
+
+class PhaseSamples:
+    """Preallocated nanosecond and allocated-block samples of one (phase, product)."""
+    __slots__ = ("nanos", "allocations", "count")
+
+    def __init__(self, capacity: int) -> None:
+        self.nanos = np.zeros(capacity, dtype=np.int64)
+        self.allocations = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+
+    def add(self, nanos: int, allocations: int) -> None:
+        # Once full, the last slot is overwritten rather than growing on the hot path
+        idx = min(self.count, len(self.nanos) - 1)
+        self.nanos[idx] = nanos
+        self.allocations[idx] = allocations
+        self.count += 1
+
+    def filled(self) -> Tuple[np.ndarray, np.ndarray]:
+        n = min(self.count, len(self.nanos))
+        return self.nanos[:n], self.allocations[:n]
+
+
+def _start_disabled() -> None:
+    return None
+
+
+def _stop_disabled(phase: str, product: Optional[str], mark: Any) -> None:
+    return None
+
+
+class Instrumentation:
+    """
+    Opt-in timers for the phases of Trader.run:
+
+        mark = instrument.start()
+        ...
+        instrument.stop(SORT, product, mark)
+
+    While disabled, start and stop are bound to functions that do nothing, so the marks
+    cost two empty calls.
+    """
+
+    def __init__(self) -> None:
+        self.capacity = DEFAULT_CAPACITY
+        self.samples: Dict[Tuple[str, Optional[str]], PhaseSamples] = {}
+        self.disable()
+
+    @property
+    def enabled(self) -> bool:
+        return "start" not in self.__dict__
+
+    def enable(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.samples = {}
+        self.__dict__.pop("start", None)
+        self.__dict__.pop("stop", None)
+
+    def disable(self) -> None:
+        self.start = _start_disabled
+        self.stop = _stop_disabled
+
+    def start(self) -> Tuple[int, int]:
+        return perf_counter_ns(), sys.getallocatedblocks()
+
+    def stop(self, phase: str, product: Optional[str], mark: Tuple[int, int]) -> None:
+        nanos = perf_counter_ns() - mark[0]
+        allocations = sys.getallocatedblocks() - mark[1]
+
+        key = (phase, product)
+        samples = self.samples.get(key)
+        if samples is None:
+            samples = self.samples[key] = PhaseSamples(self.capacity)
+        samples.add(nanos, allocations)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """One row per (phase, product) with count, p50/p95/p99/max in microseconds and median allocations."""
+        rows = []
+        for (phase, product), samples in sorted(self.samples.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+            nanos, allocations = samples.filled()
+            if len(nanos) == 0:
+                continue
+            row = {"phase": phase, "product": product or "-", "count": samples.count}
+            for percentile, value in zip(PERCENTILES, np.percentile(nanos, PERCENTILES)):
+                row[f"p{percentile}_us"] = value / 1e3
+            row["max_us"] = nanos.max() / 1e3
+            row["alloc_p50"] = float(np.median(allocations))
+            rows.append(row)
+        return rows
+
+    def format_report(self) -> str:
+        lines = [f"{'phase':<8} {'product':<18} {'count':>7} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'max us':>10} {'alloc p50':>10}"]
+        for row in self.report():
+            lines.append(
+                f"{row['phase']:<8} {row['product']:<18} {row['count']:>7} {row['p50_us']:>9.1f} {row['p95_us']:>9.1f} "
+                f"{row['p99_us']:>9.1f} {row['max_us']:>10.1f} {row['alloc_p50']:>10.0f}"
+            )
+        return "\n".join(lines)
+
+
+instrument = Instrumentation()
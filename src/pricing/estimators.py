@@ -0,0 +1,100 @@
+from typing import List, Optional
+
+from src.model.sorted_depth import SortedDepth
+
+# Fair-value estimators shared by every Trader. The book functions read one tick's
+# SortedDepth; the classes carry state across ticks, update in O(1) and round-trip through
+# to_state/from_state as short lists of numbers so they can be stored in traderData.
+
+
+def book_vwap(depth: SortedDepth) -> float:
+    """Volume weighted price over every level on both sides, 0 for an empty book."""
+    count = depth.total_volume()
+
+    if count == 0:
+        return 0
+
+    return depth.notional() / count
+
+
+def mid_price(depth: SortedDepth) -> float:
+    return (depth.best_bid + depth.best_ask) / 2
+
+
+def microprice(depth: SortedDepth) -> float:
+    """Top of book price weighted towards the side with less volume."""
+    best_buy_volume = depth.best_bid_volume
+    best_sell_volume = abs(depth.best_ask_volume)
+
+    Wa = best_buy_volume / (best_buy_volume + best_sell_volume)
+    Wb = best_sell_volume / (best_buy_volume + best_sell_volume)
+
+    return Wa * depth.best_ask + Wb * depth.best_bid
+
+
+class EMA:
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float, value: Optional[float] = None) -> None:
+        self.alpha = alpha
+        self.value = value
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def to_state(self) -> List[float]:
+        return [self.alpha, self.value]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> "EMA":
+        return cls(state[0], state[1])
+
+
+class RollingVWAP:
+    """VWAP of the last `window` (price, volume) updates, kept as running sums over a ring buffer."""
+    __slots__ = ("window", "position", "notionals", "volumes", "notional", "volume")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.position = 0
+        self.notionals: List[float] = [0.0] * window
+        self.volumes: List[float] = [0.0] * window
+        self.notional = 0.0
+        self.volume = 0.0
+
+    def update(self, price: float, volume: float) -> float:
+        slot = self.position
+        notional = price * volume
+
+        self.notional += notional - self.notionals[slot]
+        self.volume += volume - self.volumes[slot]
+        self.notionals[slot] = notional
+        self.volumes[slot] = volume
+        self.position = (slot + 1) % self.window
+
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.volume <= 0:
+            return 0
+        return self.notional / self.volume
+
+    def to_state(self) -> List[float]:
+        # Running sums are rebuilt on load, so float drift does not accumulate across ticks
+        return [self.window, self.position, *self.notionals, *self.volumes]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> "RollingVWAP":
+        window = int(state[0])
+        vwap = cls(window)
+        vwap.position = int(state[1])
+        vwap.notionals = list(state[2:2 + window])
+        vwap.volumes = list(state[2 + window:2 + 2 * window])
+        vwap.notional = sum(vwap.notionals)
+        vwap.volume = sum(vwap.volumes)
+        return vwap
@@ -0,0 +1,145 @@
+from typing import Dict, List
+
+import numpy as np
+
+from src.data.prices import BOOK_DEPTH, PriceTable
+from src.model.sorted_depth import SortedDepth
+from src.pricing import estimators
+
+# Order book features computed two ways from the same formulas: book_features over whole
+# (ticks, levels) arrays for analysis, tick_features over one SortedDepth for live code.
+# Both do the same integer sums and the same float operations in the same order, so they
+# agree to the bit. A feature that needs a side the book does not have is NaN.
+
+RATIO_LEVELS = BOOK_DEPTH
+
+FEATURES = (
+    "spread",
+    "mid_price",
+    "imbalance",
+    "microprice",
+    "book_vwap",
+    "depth_weighted_mid",
+    *(f"bid_ratio_{level}" for level in range(1, RATIO_LEVELS + 1)),
+    *(f"ask_ratio_{level}" for level in range(1, RATIO_LEVELS + 1)),
+)
+
+NAN = float("nan")
+
+
+def book_features(bid_prices: np.ndarray, bid_volumes: np.ndarray, ask_prices: np.ndarray,
+                  ask_volumes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Every feature for (ticks, levels) integer arrays, best level first, with positive volumes
+    on both sides and volume 0 for missing levels, as PriceTable stores them.
+    """
+    best_bid = bid_prices[:, 0]
+    best_ask = ask_prices[:, 0]
+    best_bid_volume = bid_volumes[:, 0]
+    best_ask_volume = ask_volumes[:, 0]
+    two_sided = (best_bid_volume > 0) & (best_ask_volume > 0)
+
+    bid_total = bid_volumes.sum(axis=1)
+    ask_total = ask_volumes.sum(axis=1)
+    bid_notional = (bid_prices * bid_volumes).sum(axis=1)
+    ask_notional = (ask_prices * ask_volumes).sum(axis=1)
+
+    features = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        top_volume = best_bid_volume + best_ask_volume
+        wa = best_bid_volume / top_volume
+        wb = best_ask_volume / top_volume
+
+        features["spread"] = np.where(two_sided, (best_ask - best_bid).astype(np.float64), np.nan)
+        features["mid_price"] = np.where(two_sided, (best_bid + best_ask) / 2, np.nan)
+        features["imbalance"] = np.where(two_sided, (best_bid_volume - best_ask_volume) / top_volume, np.nan)
+        features["microprice"] = np.where(two_sided, wa * best_ask + wb * best_bid, np.nan)
+        features["book_vwap"] = np.where(
+            two_sided, (bid_notional + ask_notional) / (bid_total + ask_total), np.nan
+        )
+        features["depth_weighted_mid"] = np.where(
+            two_sided, (bid_notional / bid_total + ask_notional / ask_total) / 2, np.nan
+        )
+
+        for level in range(RATIO_LEVELS):
+            if level < bid_volumes.shape[1]:
+                features[f"bid_ratio_{level + 1}"] = bid_volumes[:, level] / bid_total
+                features[f"ask_ratio_{level + 1}"] = ask_volumes[:, level] / ask_total
+            else:
+                features[f"bid_ratio_{level + 1}"] = np.where(bid_total > 0, 0.0, np.nan)
+                features[f"ask_ratio_{level + 1}"] = np.where(ask_total > 0, 0.0, np.nan)
+
+    return features
+
+
+def table_features(table: PriceTable) -> Dict[str, np.ndarray]:
+    return book_features(table.bid_prices(), table.bid_volumes(), table.ask_prices(), table.ask_volumes())
+
+
+def spread(depth: SortedDepth) -> float:
+    if not depth.two_sided:
+        return NAN
+    return float(depth.spread)
+
+
+def mid_price(depth: SortedDepth) -> float:
+    if not depth.two_sided:
+        return NAN
+    return depth.mid_price
+
+
+def imbalance(depth: SortedDepth) -> float:
+    """Top of book volume imbalance in [-1, 1], positive when bids outweigh asks."""
+    if not depth.two_sided:
+        return NAN
+    best_bid_volume = depth.best_bid_volume
+    best_ask_volume = -depth.best_ask_volume
+    return (best_bid_volume - best_ask_volume) / (best_bid_volume + best_ask_volume)
+
+
+def microprice(depth: SortedDepth) -> float:
+    if not depth.two_sided:
+        return NAN
+    return estimators.microprice(depth)
+
+
+def book_vwap(depth: SortedDepth) -> float:
+    if not depth.two_sided:
+        return NAN
+    return estimators.book_vwap(depth)
+
+
+def depth_weighted_mid(depth: SortedDepth) -> float:
+    """Average of the bid side VWAP and the ask side VWAP."""
+    if not depth.two_sided:
+        return NAN
+    bid_notional = sum(price * volume for price, volume in depth.bid_levels())
+    ask_notional = -sum(price * volume for price, volume in depth.ask_levels())
+    return (bid_notional / sum(depth.bid_volumes) + ask_notional / -sum(depth.ask_volumes)) / 2
+
+
+def level_ratios(volumes: List[int], levels: int = RATIO_LEVELS) -> List[float]:
+    """Share of the side's total volume at each of the first `levels` levels."""
+    total = sum(volumes)
+    if total == 0:
+        return [NAN] * levels
+    return [volumes[level] / total if level < len(volumes) else 0.0 for level in range(levels)]
+
+
+def tick_features(depth: SortedDepth) -> Dict[str, float]:
+    """Every feature for one tick, the same values book_features gives for that row."""
+    features = {
+        "spread": spread(depth),
+        "mid_price": mid_price(depth),
+        "imbalance": imbalance(depth),
+        "microprice": microprice(depth),
+        "book_vwap": book_vwap(depth),
+        "depth_weighted_mid": depth_weighted_mid(depth),
+    }
+    ask_volumes = [-volume for volume in depth.ask_volumes]
+    for level, ratio in enumerate(level_ratios(depth.bid_volumes), 1):
+        features[f"bid_ratio_{level}"] = ratio
+    for level, ratio in enumerate(level_ratios(ask_volumes), 1):
+        features[f"ask_ratio_{level}"] = ratio
+    return features
+
@@ -0,0 +1,111 @@
+from typing import List
+
+from src.model.datamodel import Order
+from src.model.logger import logger
+from src.model.lots import LotBook
+from src.pricing.estimators import book_vwap
+from src.strategies.registry import ProductContext
+
+# Product handlers for StrategyRegistry, ported from the single-product Traders. Tunable values
+# come from ctx.params, under the names the ported Trader uses in its PARAMS.
+
+
+def resin_taker(ctx: ProductContext) -> List[Order]:
+    """Take any ask at or below our_buy_price and any bid at or above our_sell_price (rainforest_resin.py)."""
+    depth = ctx.depth
+    if not depth.two_sided:
+        return []
+
+    our_buy_price = ctx.params["our_buy_price"]
+    our_sell_price = ctx.params["our_sell_price"]
+
+    orders = []
+
+    for sell_order_price, volume in zip(reversed(depth.ask_prices), reversed(depth.ask_volumes)):
+        # volume is negative
+        if sell_order_price <= our_buy_price and ctx.position - volume <= ctx.limit:
+            logger.print("BUY", str(-volume) + "x", sell_order_price)
+            orders.append(Order(ctx.product, sell_order_price, -volume))
+
+    for buy_order_price, volume in zip(reversed(depth.bid_prices), reversed(depth.bid_volumes)):
+        # volume is positive
+        if buy_order_price >= our_sell_price and ctx.position - volume >= -ctx.limit:
+            logger.print("SELL", str(volume) + "x", buy_order_price)
+            orders.append(Order(ctx.product, buy_order_price, -volume))
+
+    return orders
+
+
+def purchase_history_taker(ctx: ProductContext) -> List[Order]:
+    """Buy below the book VWAP and sell those lots at a profit (refined_model.trade_other_products)."""
+    depth = ctx.depth
+    if not depth.two_sided:
+        return []
+
+    expected_price = book_vwap(depth)
+    orders = []
+
+    lots = ctx.lots.get(ctx.product)
+    if lots is None:
+        lots = ctx.lots[ctx.product] = LotBook()
+
+    for sell_order_price, volume in depth.ask_levels():
+        if sell_order_price < expected_price and ctx.position - volume <= ctx.limit:
+            logger.print("BUY", str(-volume) + "x", sell_order_price)
+            lots.add(sell_order_price, -volume)
+            orders.append(Order(ctx.product, sell_order_price, -volume))
+
+    # Cheapest lots are matched against the lowest profitable bids first
+    sales = lots.match_bids(depth.bid_prices[::-1], depth.bid_volumes[::-1], ctx.position + ctx.limit)
+    for buy_price, sell_qty in sales:
+        logger.print("SELL", f"{sell_qty}x", buy_price)
+        orders.append(Order(ctx.product, buy_price, -sell_qty))
+
+    if not lots:
+        del ctx.lots[ctx.product]
+
+    return orders
+
+
+def market_maker(ctx: ProductContext) -> List[Order]:
+    """Quote around the book VWAP with a position skew (trader_MM.py)."""
+    depth = ctx.depth
+    if not depth.two_sided:
+        return []
+
+    limit = ctx.limit
+    current_position = ctx.position
+    mid_price = book_vwap(depth)
+
+    spread_percent = ctx.params["spread_percent"]
+    base_quote_size = ctx.params["base_quote_size"]
+
+    half_spread = mid_price * spread_percent / 2
+    position_ratio = current_position / limit if limit > 0 else 0
+    position_skew = position_ratio * half_spread
+
+    bid_price = int(mid_price - half_spread - position_skew)
+    ask_price = int(mid_price + half_spread - position_skew)
+
+    if current_position >= limit:
+        bid_quantity = 0
+    else:
+        bid_quantity = min(base_quote_size, limit - current_position)
+
+    # trader_MM.py sizes this as -max(base, position - limit), which never caps at the limit
+    if current_position <= -limit:
+        ask_quantity = 0
+    else:
+        ask_quantity = -min(base_quote_size, limit + current_position)
+
+    orders = []
+    if bid_quantity > 0:
+        logger.print("BUY", str(bid_quantity) + "x", bid_price)
+        orders.append(Order(ctx.product, bid_price, bid_quantity))
+
+    # Sell orders carry a negative quantity (trader_MM.py sends this one as a buy)
+    if ask_quantity < 0:
+        logger.print("SELL", str(ask_quantity) + "x", ask_price)
+        orders.append(Order(ctx.product, ask_price, ask_quantity))
+
+    return orders
@@ -0,0 +1,136 @@
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List
+
+from src.model.datamodel import Order, Product, Symbol, TradingState
+from src.model.lots import LotBook
+from src.model.sorted_depth import SortedDepth
+from src.perf.timers import ORDERS, SORT, instrument
+
+# The exchange kills run() calls that take longer than this, leave some headroom
+TICK_BUDGET_NS = 800_000_000
+HANDLER_BUDGET_NS = 200_000_000
+
+
+class ProductContext:
+    """Everything a handler needs for one product on one tick."""
+    __slots__ = ("product", "depth", "position", "limit", "params", "state", "lots")
+
+    def __init__(self, product: Product, depth: SortedDepth, position: int, limit: int, params: Dict[str, Any],
+                 state: TradingState, lots: Dict[Product, LotBook]) -> None:
+        self.product = product
+        self.depth = depth
+        self.position = position
+        self.limit = limit
+        # The product's entry of the Trader's PARAMS
+        self.params = params
+        self.state = state
+        # Purchase history shared by every handler, persisted in traderData by the Trader
+        self.lots = lots
+
+
+HandlerFn = Callable[[ProductContext], List[Order]]
+
+
+class Handler:
+    __slots__ = ("product", "fn", "limit", "params", "budget_ns", "stateful", "last_orders", "overran", "calls",
+                 "degraded", "elapsed_ns")
+
+    def __init__(self, product: Product, fn: HandlerFn, limit: int, params: Dict[str, Any], budget_ns: int,
+                 stateful: bool) -> None:
+        self.product = product
+        self.fn = fn
+        self.limit = limit
+        self.params = params
+        self.budget_ns = budget_ns
+        # Updates ctx.lots alongside its orders, so repeating the orders would bypass that bookkeeping
+        self.stateful = stateful
+        self.last_orders: List[Order] = []
+        self.overran = False
+        self.calls = 0
+        self.degraded = 0
+        self.elapsed_ns = 0
+
+    def cached_orders(self, position: int) -> List[Order]:
+        """
+        The previous decision, at the previous tick's prices, or nothing if the handler is stateful
+        or repeating it could breach the limit now.
+        """
+        if self.stateful:
+            return []
+        total_buy = sum(order.quantity for order in self.last_orders if order.quantity > 0)
+        total_sell = -sum(order.quantity for order in self.last_orders if order.quantity < 0)
+        if position + total_buy > self.limit or position - total_sell < -self.limit:
+            return []
+        return self.last_orders
+
+
+class StrategyRegistry:
+    """
+    Maps products to handlers and runs them in one pass over state.order_depths.
+
+    A handler that overran its budget on its previous call, or that no longer fits in what
+    is left of the tick budget, is not called; its product gets the handler's last orders
+    instead, unchanged from the previous tick's prices, or no orders for a stateful handler.
+    Budgets are checked between handlers, a running handler is never interrupted.
+    """
+
+    def __init__(self, tick_budget_ns: int = TICK_BUDGET_NS) -> None:
+        self.tick_budget_ns = tick_budget_ns
+        self.handlers: Dict[Product, Handler] = {}
+
+    def register(self, product: Product, fn: HandlerFn, limit: int, params: Dict[str, Any] = None,
+                 budget_ns: int = HANDLER_BUDGET_NS, stateful: bool = False) -> None:
+        """
+        params reach fn as ctx.params. stateful handlers, those updating ctx.lots, are skipped
+        rather than repeated when degraded.
+        """
+        if product in self.handlers:
+            raise ValueError(f"handler already registered for {product}")
+        self.handlers[product] = Handler(product, fn, limit, {} if params is None else params, budget_ns, stateful)
+
+    def dispatch(self, state: TradingState, lots: Dict[Product, LotBook]) -> Dict[Symbol, List[Order]]:
+        start = perf_counter_ns()
+        result: Dict[Symbol, List[Order]] = {}
+
+        for product, order_depth in state.order_depths.items():
+            handler = self.handlers.get(product)
+            if handler is None:
+                continue
+
+            position = state.position.get(product, 0)
+            remaining = self.tick_budget_ns - (perf_counter_ns() - start)
+            if handler.overran or remaining < handler.budget_ns:
+                result[product] = handler.cached_orders(position)
+                handler.degraded += 1
+                # Give it another chance on the next tick
+                handler.overran = False
+                continue
+
+            mark = instrument.start()
+            depth = SortedDepth(order_depth)
+            instrument.stop(SORT, product, mark)
+
+            context = ProductContext(product, depth, position, handler.limit, handler.params, state, lots)
+            mark = instrument.start()
+            handler_start = perf_counter_ns()
+            orders = handler.fn(context)
+            elapsed = perf_counter_ns() - handler_start
+            instrument.stop(ORDERS, product, mark)
+
+            handler.calls += 1
+            handler.elapsed_ns += elapsed
+            handler.overran = elapsed > handler.budget_ns
+            handler.last_orders = orders
+            result[product] = orders
+
+        return result
+
+    def report(self) -> Dict[Product, Dict[str, Any]]:
+        return {
+            product: {
+                "calls": handler.calls,
+                "degraded": handler.degraded,
+                "mean_us": handler.elapsed_ns / handler.calls / 1e3 if handler.calls else 0.0,
+            }
+            for product, handler in self.handlers.items()
+        }
@@ -1,13 +1,31 @@
 from typing import Dict, List, Tuple, Any
-from src.model.datamodel import OrderDepth, TradingState, Order, Listing, Observation, ProsperityEncoder, Symbol, Trade
-import json
+from src.model.datamodel import TradingState, Order
+from src.model.logger import logger
+from src.model.sorted_depth import SortedDepth
+from src.perf.timers import FLUSH, ORDERS, SORT, instrument
+from src.pricing.estimators import book_vwap
 
 LIMIT_RAINFOREST_RESIN = 50
 LIMIT_KELP = 50
 LIMIT_SQUID_INK = 50
 
+# Used for products missing from PARAMS
+DEFAULT_PARAMS = {
+    "spread_percent": 0.005,
+    "base_quote_size": 10,
+}
+
+PARAMS = {
+    "RAINFOREST_RESIN": dict(DEFAULT_PARAMS),
+    "KELP": dict(DEFAULT_PARAMS),
+    "SQUID_INK": dict(DEFAULT_PARAMS),
+}
+
 
 class Trader:
+    def __init__(self, params: Dict[str, Dict[str, Any]] = None):
+        self.params = PARAMS if params is None else params
+
     def run(self, state: TradingState) -> Tuple[Dict[str, List[Order]], int, str]:
         """
         Only method required. It takes all buy and sell orders for all symbols as an input,
@@ -33,15 +51,17 @@ class Trader:
             current_position = state.position.get(product, 0)
 
             # We need both buy_orders and sell_orders to determine a mid-price
-            if not order_depth.buy_orders or not order_depth.sell_orders:
+            mark = instrument.start()
+            depth = SortedDepth(order_depth)
+            instrument.stop(SORT, product, mark)
+            if not depth.two_sided:
                 continue
 
-            best_bid = max(order_depth.buy_orders.keys())   # highest buy price
-            best_ask = min(order_depth.sell_orders.keys())  # lowest sell price
-            if best_bid is None or best_ask is None:
-                continue
+            mark = instrument.start()
+            best_bid = depth.best_bid   # highest buy price
+            best_ask = depth.best_ask  # lowest sell price
 
-            mid_price = self.calculate_expected_price(order_depth)
+            mid_price = self.calculate_expected_price(depth)
             logger.print(
                 f"PRODUCT={product} | BEST_BID={best_bid} | BEST_ASK={best_ask} | MID={mid_price} | POS={current_position}")
 
@@ -49,7 +69,8 @@ class Trader:
             # 1) Choose a percentage-based spread
             #    e.g. 0.2% (0.002) or 0.5% (0.005), etc.
             # ------------------------
-            spread_percent = 0.005   # 0.2% of the mid price
+            params = self.params.get(product, DEFAULT_PARAMS)
+            spread_percent = params["spread_percent"]   # 0.2% of the mid price
             base_spread = mid_price * spread_percent
             half_spread = base_spread / 2
 
@@ -80,7 +101,7 @@ class Trader:
             # We'll define a base size. Then we'll ensure we don't exceed the limit
             # if we get fully filled.
             # ------------------------
-            base_quote_size = 10
+            base_quote_size = params["base_quote_size"]
 
             # If near or at the long limit, reduce or skip bidding
             if current_position >= limit:
@@ -115,149 +136,15 @@ class Trader:
                 orders.append(Order(product, ask_price, -ask_quantity))
 
             result[product] = orders
+            instrument.stop(ORDERS, product, mark)
 
         # No conversions in this example
         conversions = 0
         traderData = "SAMPLE"
+        mark = instrument.start()
         logger.flush(state, result, conversions, traderData)
+        instrument.stop(FLUSH, None, mark)
         return result, conversions, traderData
 
-    def calculate_expected_price(self, order_depth: OrderDepth) -> float:
-        buy_orders = order_depth.buy_orders
-        sell_orders = order_depth.sell_orders
-
-        sum = 0
-        count = 0
-
-        for price, volume in buy_orders.items():
-            sum += price * abs(volume)
-            count += abs(volume)
-
-        for price, volume in sell_orders.items():
-            sum += price * abs(volume)
-            count += abs(volume)
-
-        if count == 0:
-            return 0
-
-        return sum / count
-
-
-class Logger:
-    def __init__(self) -> None:
-        self.logs = ""
-        self.max_log_length = 3750
-
-    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
-        self.logs += sep.join(map(str, objects)) + end
-
-    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
-        base_length = len(
-            self.to_json(
-                [
-                    self.compress_state(state, ""),
-                    self.compress_orders(orders),
-                    conversions,
-                    "",
-                    "",
-                ]
-            )
-        )
-
-        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
-        max_item_length = (self.max_log_length - base_length) // 3
-
-        print(
-            self.to_json(
-                [
-                    self.compress_state(state, self.truncate(
-                        state.traderData, max_item_length)),
-                    self.compress_orders(orders),
-                    conversions,
-                    self.truncate(trader_data, max_item_length),
-                    self.truncate(self.logs, max_item_length),
-                ]
-            )
-        )
-
-        self.logs = ""
-
-    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
-        return [
-            state.timestamp,
-            trader_data,
-            self.compress_listings(state.listings),
-            self.compress_order_depths(state.order_depths),
-            self.compress_trades(state.own_trades),
-            self.compress_trades(state.market_trades),
-            state.position,
-            self.compress_observations(state.observations),
-        ]
-
-    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[list[Any]]:
-        compressed = []
-        for listing in listings.values():
-            compressed.append(
-                [listing.symbol, listing.product, listing.denomination])
-
-        return compressed
-
-    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
-        compressed = {}
-        for symbol, order_depth in order_depths.items():
-            compressed[symbol] = [
-                order_depth.buy_orders, order_depth.sell_orders]
-
-        return compressed
-
-    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
-        compressed = []
-        for arr in trades.values():
-            for trade in arr:
-                compressed.append(
-                    [
-                        trade.symbol,
-                        trade.price,
-                        trade.quantity,
-                        trade.buyer,
-                        trade.seller,
-                        trade.timestamp,
-                    ]
-                )
-
-        return compressed
-
-    def compress_observations(self, observations: Observation) -> list[Any]:
-        conversion_observations = {}
-        for product, observation in observations.conversionObservations.items():
-            conversion_observations[product] = [
-                observation.bidPrice,
-                observation.askPrice,
-                observation.transportFees,
-                observation.exportTariff,
-                observation.importTariff,
-                observation.sugarPrice,
-                observation.sunlightIndex,
-            ]
-
-        return [observations.plainValueObservations, conversion_observations]
-
-    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[list[Any]]:
-        compressed = []
-        for arr in orders.values():
-            for order in arr:
-                compressed.append([order.symbol, order.price, order.quantity])
-
-        return compressed
-
-    def to_json(self, value: Any) -> str:
-        return json.dumps(value, cls=ProsperityEncoder, separators=(",", ":"))
-
-    def truncate(self, value: str, max_length: int) -> str:
-        if len(value) <= max_length:
-            return value
-
-        return value[: max_length - 3] + "..."
-
-
-logger = Logger()
+    def calculate_expected_price(self, depth: SortedDepth) -> float:
+        return book_vwap(depth)
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Tuple
+from src.model.datamodel import TradingState, Order
+from src.model import trader_data
+from src.model.logger import logger
+from src.perf.timers import DECODE, ENCODE, FLUSH, instrument
+from src.strategies.handlers import market_maker, purchase_history_taker, resin_taker
+from src.strategies.registry import StrategyRegistry
+
+LIMIT_RAINFOREST_RESIN = 50
+LIMIT_KELP = 50
+LIMIT_SQUID_INK = 50
+
+PARAMS = {
+    "RAINFOREST_RESIN": {
+        "our_buy_price": 9999,
+        "our_sell_price": 10001,
+    },
+    "KELP": {
+    },
+    "SQUID_INK": {
+        "spread_percent": 0.005,
+        "base_quote_size": 10,
+    },
+}
+
+
+class Trader:
+    def __init__(self, params: Dict[str, Dict[str, Any]] = None):
+        # The exchange constructs Trader() with no arguments, sweeps pass their own PARAMS
+        self.params = PARAMS if params is None else params
+        # Each product's logic is registered once; run() dispatches in a single pass
+        self.registry = StrategyRegistry()
+        self.registry.register("RAINFOREST_RESIN", resin_taker, LIMIT_RAINFOREST_RESIN, self.params["RAINFOREST_RESIN"])
+        self.registry.register("KELP", purchase_history_taker, LIMIT_KELP, self.params["KELP"], stateful=True)
+        self.registry.register("SQUID_INK", market_maker, LIMIT_SQUID_INK, self.params["SQUID_INK"])
+
+    def run(self, state: TradingState) -> Tuple[Dict[str, List[Order]], int, str]:
+        """
+        Only method required. It takes all buy and sell orders for all symbols as an input,
+        and outputs a list of orders to be sent
+        """
+        mark = instrument.start()
+        fields = trader_data.loads(state.traderData)
+        lots = trader_data.decode_lots(fields[0]) if fields else {}
+        instrument.stop(DECODE, None, mark)
+
+        result = self.registry.dispatch(state, lots)
+
+        # No conversions in this example
+        conversions = 0
+        mark = instrument.start()
+        traderData = trader_data.dumps([trader_data.encode_lots(lots)])
+        instrument.stop(ENCODE, None, mark)
+
+        mark = instrument.start()
+        logger.flush(state, result, conversions, traderData)
+        instrument.stop(FLUSH, None, mark)
+        return result, conversions, traderData
@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from src.bundle import ROOT_DIR, bundle
+
+PRICES = os.path.join(ROOT_DIR, "data", "9fdbd176-6608-474e-9a09-8391c1277588.csv")
+TICKS = 300
+
+# Replays the first ticks of a price file through the Trader in argv[1] with nothing but the
+# standard library and datamodel, filling orders that cross the best quote, and prints what
+# run() returned at every tick. Log output is swallowed, it carries the traderData as well.
+REPLAY = '''
+import contextlib, csv, importlib.util, io, json, sys
+from datamodel import Listing, Observation, OrderDepth, Trade, TradingState
+
+spec = importlib.util.spec_from_file_location("trader", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+sys.modules["trader"] = module
+spec.loader.exec_module(module)
+trader = module.Trader()
+
+books = {}
+with open(sys.argv[2], newline="") as f:
+    for row in csv.DictReader(f, delimiter=";"):
+        depth = OrderDepth()
+        for level in (1, 2, 3):
+            if row[f"bid_price_{level}"]:
+                depth.buy_orders[int(row[f"bid_price_{level}"])] = int(row[f"bid_volume_{level}"])
+            if row[f"ask_price_{level}"]:
+                depth.sell_orders[int(row[f"ask_price_{level}"])] = -int(row[f"ask_volume_{level}"])
+        books.setdefault(int(row["timestamp"]), {})[row["product"]] = depth
+
+trader_data, position, own_trades, results = "", {}, {}, []
+for timestamp in sorted(books)[:int(sys.argv[3])]:
+    listings = {symbol: Listing(symbol, symbol, "SEASHELLS") for symbol in books[timestamp]}
+    state = TradingState(trader_data, timestamp, listings, books[timestamp], own_trades, {}, dict(position),
+                         Observation({}, {}))
+    with contextlib.redirect_stdout(io.StringIO()):
+        orders, conversions, trader_data = trader.run(state)
+    own_trades = {}
+    for symbol, symbol_orders in orders.items():
+        depth = books[timestamp][symbol]
+        for order in symbol_orders:
+            if order.quantity > 0 and depth.sell_orders and order.price >= min(depth.sell_orders):
+                price = min(depth.sell_orders)
+            elif order.quantity < 0 and depth.buy_orders and order.price <= max(depth.buy_orders):
+                price = max(depth.buy_orders)
+            else:
+                continue
+            position[symbol] = position.get(symbol, 0) + order.quantity
+            own_trades.setdefault(symbol, []).append(
+                Trade(symbol, price, abs(order.quantity), "SUBMISSION" if order.quantity > 0 else "",
+                      "" if order.quantity > 0 else "SUBMISSION", timestamp))
+    results.append([{symbol: [[o.price, o.quantity] for o in symbol_orders] for symbol, symbol_orders in orders.items()}, conversions, trader_data])
+print(json.dumps(results))
+'''
+
+STRATEGIES = [
+    "refined_model.py",
+    "src/strategies/trader.py",
+    "src/strategies/trader_MM.py",
+    "src/strategies/kelp.py",
+    "src/strategies/rainforest_resin.py",
+    "src/strategies/trader_registry.py",
+]
+
+
+def replay(strategy_path: str, cwd: str, isolated: bool) -> list:
+    # -E -s keep PYTHONPATH and user site-packages out, so src is only importable from cwd
+    flags = ["-E", "-s"] if isolated else []
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    completed = subprocess.run(
+        [sys.executable, *flags, "-c", REPLAY, strategy_path, PRICES, str(TICKS)],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_bundle_runs_without_src(tmp_path, strategy):
+    source_path = os.path.join(ROOT_DIR, strategy)
+    bundle_path = tmp_path / os.path.basename(strategy)
+    bundle_path.write_text(bundle(source_path), encoding="utf-8")
+    shutil.copy(os.path.join(ROOT_DIR, "datamodel.py"), tmp_path)
+
+    bundled = replay(str(bundle_path), str(tmp_path), isolated=True)
+    assert any(orders for orders, _, _ in bundled)
+    assert bundled == replay(source_path, ROOT_DIR, isolated=False)
+
+
+def test_unbundled_strategy_needs_src(tmp_path):
+    shutil.copy(os.path.join(ROOT_DIR, "refined_model.py"), tmp_path)
+    shutil.copy(os.path.join(ROOT_DIR, "datamodel.py"), tmp_path)
+    completed = subprocess.run(
+        [sys.executable, "-E", "-s", "-c", "import refined_model"], cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert "ModuleNotFoundError" in completed.stderr
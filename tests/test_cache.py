@@ -0,0 +1,54 @@
+import os
+import shutil
+
+import numpy as np
+
+from src.backtest.engine import ROOT_DIR, MarketData, run_backtest
+from src.data.cache import cache_dir, read_arrays
+from src.data.logs import load_log, parse_log
+from src.data.prices import CACHE_KIND, CACHE_VERSION, load_prices, parse_prices
+from src.model.logger import EAGER
+
+PRICES = os.path.join(ROOT_DIR, "data", "9fdbd176-6608-474e-9a09-8391c1277588.csv")
+
+
+def test_price_cache_round_trip(tmp_path):
+    path = str(tmp_path / "prices.csv")
+    shutil.copy(PRICES, path)
+    parsed = parse_prices(path)
+
+    for _ in range(2):
+        loaded = load_prices(path)
+        assert sorted(loaded) == sorted(parsed)
+        for product, table in parsed.items():
+            for column, values in table.columns.items():
+                assert np.array_equal(loaded[product][column], values)
+    assert isinstance(loaded[sorted(loaded)[0]]["mid_price"], np.memmap)
+
+    # A changed source invalidates the cache
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert read_arrays(path, CACHE_KIND, CACHE_VERSION) is None
+
+
+def test_log_cache_round_trip(tmp_path, capsys):
+    import refined_model
+
+    data = MarketData.from_files([PRICES])
+    run_backtest(refined_model.Trader(), data, quiet=False, log_mode=EAGER)
+    path = str(tmp_path / "submission.log")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(capsys.readouterr().out)
+
+    parsed = parse_log(path)
+    for _ in range(2):
+        loaded = load_log(path)
+        assert loaded.products == parsed.products
+        assert sorted(loaded.columns) == sorted(parsed.columns)
+        for column, values in parsed.columns.items():
+            assert np.array_equal(loaded[column], values)
+    assert len(loaded) == len(data.timestamps)
+
+    # Price and log caches of one path never read each other's meta.json
+    assert read_arrays(path, CACHE_KIND, CACHE_VERSION) is None
+    assert os.path.isdir(cache_dir(path))
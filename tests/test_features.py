@@ -0,0 +1,52 @@
+import os
+import random
+
+import numpy as np
+
+from src.backtest.engine import ROOT_DIR
+from src.data.prices import BOOK_DEPTH, load_prices
+from src.model.datamodel import OrderDepth
+from src.model.sorted_depth import SortedDepth
+from src.pricing.features import FEATURES, book_features, table_features, tick_features
+
+PRICES = os.path.join(ROOT_DIR, "data", "9fdbd176-6608-474e-9a09-8391c1277588.csv")
+
+
+def row_depth(bid_prices, bid_volumes, ask_prices, ask_volumes) -> OrderDepth:
+    """OrderDepth of one row of (levels,) arrays, missing levels having volume 0."""
+    depth = OrderDepth()
+    depth.buy_orders = {int(p): int(v) for p, v in zip(bid_prices, bid_volumes) if v > 0}
+    depth.sell_orders = {int(p): -int(v) for p, v in zip(ask_prices, ask_volumes) if v > 0}
+    return depth
+
+
+def assert_rows_match(features, bid_prices, bid_volumes, ask_prices, ask_volumes):
+    for row in range(len(bid_prices)):
+        depth = row_depth(bid_prices[row], bid_volumes[row], ask_prices[row], ask_volumes[row])
+        tick = tick_features(SortedDepth(depth))
+        for name in FEATURES:
+            # Same value to the bit, NaN where a side is missing
+            assert np.array_equal(features[name][row], tick[name], equal_nan=True), (row, name)
+
+
+def test_table_features_match_tick_features():
+    for table in load_prices(PRICES).values():
+        assert_rows_match(table_features(table), table.bid_prices(), table.bid_volumes(),
+                          table.ask_prices(), table.ask_volumes())
+
+
+def test_partial_books_match_tick_features():
+    rng = random.Random(11)
+    rows = 5000
+    books = {name: np.zeros((rows, BOOK_DEPTH), dtype=np.int64) for name in ("bp", "bv", "ap", "av")}
+    for row in range(rows):
+        # Empty, one-sided and partial books, best level first
+        bids = sorted(rng.sample(range(90, 100), rng.randint(0, BOOK_DEPTH)), reverse=True)
+        asks = sorted(rng.sample(range(100, 110), rng.randint(0, BOOK_DEPTH)))
+        for level, price in enumerate(bids):
+            books["bp"][row, level], books["bv"][row, level] = price, rng.randint(1, 30)
+        for level, price in enumerate(asks):
+            books["ap"][row, level], books["av"][row, level] = price, rng.randint(1, 30)
+
+    features = book_features(books["bp"], books["bv"], books["ap"], books["av"])
+    assert_rows_match(features, books["bp"], books["bv"], books["ap"], books["av"])
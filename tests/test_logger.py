@@ -0,0 +1,72 @@
+import json
+import random
+
+import pytest
+
+from src.model.datamodel import Listing, Observation, OrderDepth, TradingState
+from src.model.logger import DELTA, DELTA_ZLIB, FULL, KEYFRAME_INTERVAL, DepthDecoder, Logger
+
+SYMBOLS = ("A", "B", "C", "D")
+
+
+def random_depth(rng: random.Random) -> OrderDepth:
+    depth = OrderDepth()
+    # Empty, one-sided and two-sided books around a common price
+    mid = 100 + rng.randint(-3, 3)
+    for _ in range(rng.choice((0, 0, 1, 2, 3))):
+        depth.buy_orders[mid - rng.randint(1, 4)] = rng.randint(1, 20)
+    for _ in range(rng.choice((0, 0, 1, 2, 3))):
+        depth.sell_orders[mid + rng.randint(1, 4)] = -rng.randint(1, 20)
+    return depth
+
+
+def step_depth(rng: random.Random, previous: OrderDepth) -> OrderDepth:
+    """previous with one level changed, added or removed, so most lines are written as deltas."""
+    depth = OrderDepth()
+    depth.buy_orders = dict(previous.buy_orders)
+    depth.sell_orders = dict(previous.sell_orders)
+    side, sign, offset = rng.choice(((depth.buy_orders, 1, -1), (depth.sell_orders, -1, 1)))
+    if side and rng.random() < 0.3:
+        del side[rng.choice(list(side))]
+    else:
+        side[100 + offset * rng.randint(1, 4)] = sign * rng.randint(1, 20)
+    return depth
+
+
+def random_states(seed: int, ticks: int):
+    rng = random.Random(seed)
+    depths = {}
+    for timestamp in range(0, ticks * 100, 100):
+        for symbol in SYMBOLS:
+            roll = rng.random()
+            # Symbols disappear, reappear, get new books or change a level at a time
+            if roll < 0.05:
+                depths.pop(symbol, None)
+            elif symbol not in depths or roll < 0.1:
+                depths[symbol] = random_depth(rng)
+            elif roll < 0.8:
+                depths[symbol] = step_depth(rng, depths[symbol])
+        order_depths = dict(depths)
+        listings = {symbol: Listing(symbol, symbol, "SEASHELLS") for symbol in order_depths}
+        yield TradingState("", timestamp, listings, order_depths, {}, {}, {}, Observation({}, {}))
+
+
+def order_depths(logger: Logger, state: TradingState):
+    return json.loads(logger.encode(state, {}, 0, ""))[0][3]
+
+
+@pytest.mark.parametrize("encoding", [DELTA, DELTA_ZLIB])
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_decodes_to_full(encoding, seed):
+    full, delta, decoder = Logger(depth_encoding=FULL), Logger(depth_encoding=encoding), DepthDecoder()
+    for state in random_states(seed, 3 * KEYFRAME_INTERVAL):
+        assert decoder.decode(order_depths(delta, state)) == order_depths(full, state)
+
+
+def test_new_empty_book_is_written():
+    delta, decoder = Logger(depth_encoding=DELTA), DepthDecoder()
+    states = list(random_states(0, 2))
+    states[0].order_depths = {"A": OrderDepth()}
+    states[1].order_depths = {"A": OrderDepth(), "B": OrderDepth()}
+    decoder.decode(order_depths(delta, states[0]))
+    assert decoder.decode(order_depths(delta, states[1])) == {"A": [{}, {}], "B": [{}, {}]}
@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.backtest.matching import (
+    SUBMISSION, exceeds_limit, match_orders, match_product, sweep_fills, sweep_limit_mask,
+)
+from src.model.datamodel import Order, OrderDepth
+
+BOOKS = 5000
+LEVELS = 3
+
+
+def random_depth(rng: random.Random, levels: int = LEVELS) -> OrderDepth:
+    depth = OrderDepth()
+    for _ in range(rng.randint(0, levels)):
+        depth.buy_orders[rng.randint(90, 100)] = rng.randint(1, 10)
+    for _ in range(rng.randint(0, levels)):
+        depth.sell_orders[rng.randint(100, 110)] = -rng.randint(1, 10)
+    return depth
+
+
+def random_orders(rng: random.Random, count: int):
+    return [Order("A", rng.randint(88, 112), rng.choice((-1, 1)) * rng.randint(1, 15)) for _ in range(count)]
+
+
+def naive_match(orders, order_depth):
+    """One order at a time, best level first, against a copy of the book."""
+    asks = {price: -volume for price, volume in order_depth.sell_orders.items()}
+    bids = dict(order_depth.buy_orders)
+    fills = []
+    for order in orders:
+        remaining = abs(order.quantity)
+        buying = order.quantity > 0
+        book = asks if buying else bids
+        for price in sorted(book, reverse=not buying):
+            if not remaining or (price > order.price if buying else price < order.price):
+                break
+            quantity = min(remaining, book[price])
+            book[price] -= quantity
+            remaining -= quantity
+            if not book[price]:
+                del book[price]
+            fills.append((price, quantity, SUBMISSION if buying else "", "" if buying else SUBMISSION))
+    return fills
+
+
+def test_match_product_matches_naive_fills():
+    rng = random.Random(3)
+    for _ in range(BOOKS):
+        depth = random_depth(rng)
+        orders = random_orders(rng, rng.randint(1, 4))
+        trades = match_product(orders, depth, 100)
+        assert [(t.price, t.quantity, t.buyer, t.seller) for t in trades] == naive_match(orders, depth)
+        assert all(trade.timestamp == 100 and trade.symbol == "A" for trade in trades)
+
+
+def test_match_product_leaves_the_book_untouched():
+    rng = random.Random(4)
+    depth = random_depth(rng)
+    buy_orders, sell_orders = dict(depth.buy_orders), dict(depth.sell_orders)
+    match_product(random_orders(rng, 4), depth)
+    assert depth.buy_orders == buy_orders and depth.sell_orders == sell_orders
+
+
+def test_exceeds_limit_cancels_the_whole_batch():
+    rng = random.Random(5)
+    depths = {"A": OrderDepth()}
+    depths["A"].sell_orders = {101: -50, 102: -50}
+    depths["A"].buy_orders = {99: 50}
+
+    # Buys alone would take the position past the limit, even if the sells net it out
+    orders = {"A": [Order("A", 102, 8), Order("A", 99, -8)]}
+    result = match_orders(orders, depths, {"A": 15}, {"A": 20})
+    assert result.rejected == ["A"]
+    assert result.own_trades == {} and result.position == {"A": 15}
+
+    result = match_orders(orders, depths, {"A": 12}, {"A": 20})
+    assert result.rejected == [] and result.position == {"A": 12}
+    assert [(t.price, t.quantity) for t in result.own_trades["A"]] == [(101, 8), (99, 8)]
+
+    for _ in range(BOOKS):
+        orders = random_orders(rng, rng.randint(1, 4))
+        position, limit = rng.randint(-20, 20), 20
+        buys = sum(order.quantity for order in orders if order.quantity > 0)
+        sells = -sum(order.quantity for order in orders if order.quantity < 0)
+        assert exceeds_limit(orders, position, limit) == (position + buys > limit or position - sells < -limit)
+
+
+def sweep_books(rng: random.Random, rows: int):
+    """(rows, LEVELS) books, best level first, missing levels as price 0 and volume 0 as in price files."""
+    depths = [random_depth(rng) for _ in range(rows)]
+    arrays = {name: np.zeros((rows, LEVELS), dtype=np.int64) for name in ("bp", "bv", "ap", "av")}
+    for row, depth in enumerate(depths):
+        for level, price in enumerate(sorted(depth.buy_orders, reverse=True)):
+            arrays["bp"][row, level], arrays["bv"][row, level] = price, depth.buy_orders[price]
+        for level, price in enumerate(sorted(depth.sell_orders)):
+            arrays["ap"][row, level], arrays["av"][row, level] = price, -depth.sell_orders[price]
+    return depths, arrays
+
+
+def test_sweep_fills_matches_match_product():
+    rng = random.Random(6)
+    depths, books = sweep_books(rng, BOOKS)
+    orders = [random_orders(rng, 1)[0] for _ in range(BOOKS)]
+
+    filled, cash = sweep_fills(books["bp"], books["bv"], books["ap"], books["av"],
+                               np.array([order.price for order in orders]),
+                               np.array([order.quantity for order in orders]))
+
+    for row, (order, depth) in enumerate(zip(orders, depths)):
+        trades = match_product([order], depth)
+        sign = 1 if order.quantity > 0 else -1
+        assert filled[row] == sign * sum(trade.quantity for trade in trades)
+        assert cash[row] == -sign * sum(trade.price * trade.quantity for trade in trades)
+
+
+@pytest.mark.parametrize("limit", [0, 20])
+def test_sweep_limit_mask_matches_exceeds_limit(limit):
+    rng = random.Random(7)
+    batches = [random_orders(rng, rng.randint(1, 4)) for _ in range(BOOKS)]
+    positions = np.array([rng.randint(-limit, limit) for _ in batches])
+    buys = np.array([sum(o.quantity for o in orders if o.quantity > 0) for orders in batches])
+    sells = np.array([-sum(o.quantity for o in orders if o.quantity < 0) for orders in batches])
+
+    mask = sweep_limit_mask(positions, buys, sells, limit)
+    assert mask.tolist() == [exceeds_limit(orders, int(position), limit) for orders, position in zip(batches, positions)]
@@ -0,0 +1,17 @@
+from src.data.prices import find_price_files
+
+PRICE_HEADER = "day;timestamp;product;bid_price_1;bid_volume_1;ask_price_1;ask_volume_1;mid_price;profit_and_loss\n"
+TRADE_HEADER = "timestamp;buyer;seller;symbol;currency;price;quantity\n"
+
+
+def test_find_price_files_searches_rounds_and_skips_trades(tmp_path):
+    (tmp_path / "round1" / "prices_round_1_day_0.csv.npcache").mkdir(parents=True)
+    (tmp_path / "submission.csv").write_text(PRICE_HEADER)
+    (tmp_path / "trades_round_1_day_0.csv").write_text(TRADE_HEADER)
+    (tmp_path / "round1" / "prices_round_1_day_0.csv").write_text(PRICE_HEADER)
+    (tmp_path / "round1" / "trades_round_1_day_0.csv").write_text(TRADE_HEADER)
+
+    assert find_price_files(str(tmp_path)) == [
+        str(tmp_path / "round1" / "prices_round_1_day_0.csv"),
+        str(tmp_path / "submission.csv"),
+    ]
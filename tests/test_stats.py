@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.analysis import stats
+from src.analysis.stats import file_stats, grouped_stats
+
+COLUMNS = ("mid_price", "bid_price_2", "bid_volume_2", "profit_and_loss")
+LAGS = (1, 3)
+QUANTILES = (0.1, 0.5, 0.9)
+HEADER = ("day;timestamp;product;bid_price_1;bid_volume_1;bid_price_2;bid_volume_2;bid_price_3;bid_volume_3;"
+          "ask_price_1;ask_volume_1;ask_price_2;ask_volume_2;ask_price_3;ask_volume_3;mid_price;profit_and_loss")
+
+
+def write_prices(path, rng, days=(-1, 0), rows=400):
+    lines = [HEADER]
+    expected = {}
+    for day in days:
+        mid = 100 + np.cumsum(rng.integers(-2, 3, rows)) / 2
+        # Exchange files write 0 for one-sided books and leave absent levels empty
+        mid[rng.random(rows) < 0.1] = 0
+        bid_2 = np.where(rng.random(rows) < 0.3, 0, mid.astype(int) - 2)
+        volume_2 = np.where(bid_2 == 0, 0, rng.integers(1, 10, rows))
+        pnl = np.where(rng.random(rows) < 0.3, 0.0, rng.normal(0, 5, rows).round(1))
+        for timestamp in range(rows):
+            level_2 = f"{bid_2[timestamp]};{volume_2[timestamp]}" if bid_2[timestamp] else ";"
+            lines.append(f"{day};{timestamp * 100};KELP;99;5;{level_2};;;101;5;;;;;{mid[timestamp]};{pnl[timestamp]}")
+        expected[(day, "KELP")] = {
+            "mid_price": (mid, mid == 0),
+            "bid_price_2": (bid_2.astype(float), bid_2 == 0),
+            "bid_volume_2": (volume_2.astype(float), bid_2 == 0),
+            "profit_and_loss": (pnl, np.zeros(rows, dtype=bool)),
+        }
+    path.write_text("\n".join(lines) + "\n")
+    return expected
+
+
+def naive_stats(values, missing):
+    present = values[~missing]
+    result = {
+        "count": len(present),
+        "mean": present.mean(),
+        "variance": present.var(ddof=1),
+        "min": present.min(),
+        "max": present.max(),
+        "quantiles": dict(zip(QUANTILES, np.quantile(present, QUANTILES))),
+        "autocorrelation": {},
+    }
+    for lag in LAGS:
+        keep = ~(missing[:-lag] | missing[lag:])
+        result["autocorrelation"][lag] = np.corrcoef(values[:-lag][keep], values[lag:][keep])[0, 1]
+    return result
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_grouped_stats_match_numpy(tmp_path, monkeypatch, use_cache):
+    expected = write_prices(tmp_path / "prices.csv", np.random.default_rng(7))
+    # Small chunks carry lag pairs across chunk boundaries
+    monkeypatch.setattr(stats, "file_stats", lambda path, columns, lags: file_stats(path, columns, lags, 64))
+    for _ in range(2 if use_cache else 1):
+        result = grouped_stats([str(tmp_path / "prices.csv")], COLUMNS, QUANTILES, LAGS, use_cache)
+
+    assert sorted(result) == sorted(expected)
+    for group, by_column in expected.items():
+        for column, (values, missing) in by_column.items():
+            naive = naive_stats(values, missing)
+            got = result[group][column]
+            assert got["count"] == naive["count"]
+            for key in ("mean", "variance", "min", "max"):
+                assert got[key] == pytest.approx(naive[key])
+            assert got["quantiles"] == pytest.approx(naive["quantiles"])
+            assert got["autocorrelation"] == pytest.approx(naive["autocorrelation"])
+
+
+def test_zero_is_a_value_outside_price_columns(tmp_path):
+    write_prices(tmp_path / "prices.csv", np.random.default_rng(1), days=(0,), rows=50)
+    result = grouped_stats([str(tmp_path / "prices.csv")], ("profit_and_loss",), use_cache=False)
+    assert result[(0, "KELP")]["profit_and_loss"]["count"] == 50
@@ -0,0 +1,170 @@
+import glob
+import json
+import os
+import random
+
+import pytest
+
+import refined_model
+from src.backtest.engine import ROOT_DIR, MarketData, run_backtest
+from src.model import trader_data
+from src.model.lots import LotBook
+from src.model.trader_data import FieldCodec, LazyFields, decode_lots, dumps, encode_lots, loads
+
+BOOKS = 20000
+LIMIT = 50
+
+
+def random_lots(rng: random.Random) -> LotBook:
+    lots = LotBook()
+    for _ in range(rng.randint(0, 6)):
+        lots.add(rng.randint(95, 105), rng.randint(1, 10))
+    return lots
+
+
+def old_process_sell_orders(purchases, bid_prices, bid_volumes, current_position, limit):
+    """The two-pointer loop refined_model used before LotBook, on {price: quantity}."""
+    sales = []
+    purchase_prices = sorted(purchases)
+    bid_volumes = list(bid_volumes)
+    available_position = current_position
+    i = j = 0
+    while i < len(purchase_prices) and j < len(bid_prices):
+        purchase_price = purchase_prices[i]
+        if bid_prices[j] > purchase_price:
+            sell_qty = min(purchases[purchase_price], bid_volumes[j])
+            if available_position - sell_qty < -limit:
+                break
+            sales.append((bid_prices[j], sell_qty))
+            purchases[purchase_price] -= sell_qty
+            available_position -= sell_qty
+            bid_volumes[j] -= sell_qty
+            if bid_volumes[j] == 0:
+                j += 1
+            if purchases[purchase_price] == 0:
+                del purchases[purchase_price]
+                i += 1
+            if not purchases:
+                break
+        else:
+            j += 1
+    return sales
+
+
+def test_match_bids_matches_two_pointer_loop():
+    rng = random.Random(9)
+    for _ in range(BOOKS):
+        lots = random_lots(rng)
+        purchases = lots.to_dict()
+        # Lowest bid first, as refined_model passes depth.bid_prices[::-1]
+        bid_prices = sorted(rng.sample(range(94, 108), rng.randint(0, 4)))
+        bid_volumes = [rng.randint(1, 15) for _ in bid_prices]
+        position = rng.randint(-LIMIT, LIMIT)
+
+        sales = lots.match_bids(bid_prices, bid_volumes, position + LIMIT)
+        assert sales == old_process_sell_orders(purchases, bid_prices, bid_volumes, position, LIMIT)
+        assert lots.to_dict() == purchases
+
+
+def test_flat_round_trip():
+    rng = random.Random(10)
+    for _ in range(1000):
+        lots = random_lots(rng)
+        flat = lots.to_flat()
+        assert flat[::2] == sorted(flat[::2])
+        assert LotBook.from_flat(flat).to_dict() == lots.to_dict()
+
+        packed = json.loads(json.dumps(encode_lots({"KELP": lots})))
+        assert {product: book.to_dict() for product, book in decode_lots(packed).items()} == (
+            {"KELP": lots.to_dict()} if lots else {}
+        )
+
+
+@pytest.mark.parametrize("source", [
+    "",
+    "not json",
+    '{"py/object": "refined_model.TraderDataObject", "purchase_history": {}}',
+    json.dumps([trader_data.TRADER_DATA_VERSION + 1, {"KELP": [100, 1]}]),
+    "[]",
+])
+def test_other_versions_decode_empty(source):
+    assert loads(source) is None
+    data = refined_model.TraderDataObject.from_json_string(source)
+    assert data.purchase_history.lots == {}
+    # Unreadable sources are not handed back, or they would be carried on every later tick
+    assert data.to_json_string() == (source if not source else dumps([{}]))
+
+
+def test_unparsed_foreign_source_is_replaced():
+    source = json.dumps([trader_data.TRADER_DATA_VERSION + 1, {"KELP": [100, 1]}])
+    # Nothing accessed, so encode() decides without the fields being parsed first
+    assert refined_model.TraderDataObject.from_json_string(source).to_json_string() == dumps([{}])
+
+
+def int_codec() -> FieldCodec:
+    return FieldCodec(int, int, lambda: 0)
+
+
+def test_unchanged_source_is_returned_as_is():
+    source = dumps([{"KELP": [100, 2, 101, 1]}, 7])
+    fields = LazyFields(source, (FieldCodec(decode_lots, encode_lots, dict), int_codec()))
+    assert fields.encode() is source
+    fields.get(0)
+    fields.get(1)
+    assert fields.encode() is source
+
+
+def test_untouched_and_trailing_fields_are_kept():
+    # Field 0 is written by hand, keys out of the order json.dumps would give
+    source = '[%d,{"B":[5,1],"A":[3,2]},7,"newer",[1,2]]' % trader_data.TRADER_DATA_VERSION
+    fields = LazyFields(source, (FieldCodec(decode_lots, encode_lots, dict), int_codec()))
+    fields.set(1, 8)
+    assert json.loads(fields.encode()) == [trader_data.TRADER_DATA_VERSION, {"B": [5, 1], "A": [3, 2]}, 8, "newer", [1, 2]]
+    # Missing fields come back empty and are written out
+    fields = LazyFields(dumps([{}]), (FieldCodec(decode_lots, encode_lots, dict), int_codec()))
+    assert fields.get(1) == 0
+    fields.set(0, {"A": LotBook.from_flat([3, 2])})
+    assert fields.encode() == dumps([{"A": [3, 2]}, 0])
+
+
+class Recorder:
+    """Records what traderData every run() was given and returned."""
+
+    def __init__(self, trader) -> None:
+        self.trader = trader
+        self.calls = []
+
+    def run(self, state):
+        orders, conversions, data = self.trader.run(state)
+        self.calls.append((state.traderData, data, {symbol: [(o.price, o.quantity) for o in symbol_orders] for symbol, symbol_orders in orders.items()}))
+        return orders, conversions, data
+
+
+def decoded(data: str):
+    fields = loads(data) or [{}]
+    return {product: book.to_dict() for product, book in decode_lots(fields[0]).items()}
+
+
+def test_refined_model_replay_matches_eager_encoding(monkeypatch):
+    data = MarketData.from_files(sorted(glob.glob(os.path.join(ROOT_DIR, "data", "*.csv"))))
+    lazy = Recorder(refined_model.Trader())
+    run_backtest(lazy, data)
+
+    encode = LazyFields.encode
+
+    def eager_encode(fields):
+        fields.dirty.update(range(len(fields.codecs)))
+        return encode(fields)
+
+    monkeypatch.setattr(LazyFields, "encode", eager_encode)
+    eager = Recorder(refined_model.Trader())
+    run_backtest(eager, data)
+
+    assert len(lazy.calls) == len(eager.calls) == len(data.timestamps)
+    verbatim = 0
+    for (given, returned, orders), (_, eager_returned, eager_orders) in zip(lazy.calls, eager.calls):
+        assert orders == eager_orders
+        assert decoded(returned) == decoded(eager_returned)
+        verbatim += returned is given
+    # Most ticks change no lots on the bundled day
+    assert verbatim > len(lazy.calls) // 2